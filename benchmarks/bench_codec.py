@@ -0,0 +1,107 @@
+"""Per-message cost of the protocol codec, before and after.
+
+"before" re-creates what the client did originally: build a nested dict and
+json.dumps it for every outbound frame, and json.loads plus an if-chain for
+every inbound frame. "after" uses codec.py and the client's handler table.
+
+Run from the repository root in an environment with Home Assistant installed:
+
+    python benchmarks/bench_codec.py
+"""
+import asyncio
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from homeassistant.core import HomeAssistant  # noqa: E402
+
+from custom_components.jellyfish_lighting import codec  # noqa: E402
+from custom_components.jellyfish_lighting.websocket_api import JellyfishClient  # noqa: E402
+
+N = 200_000
+ZONES = [f"Zone {i}" for i in range(8)]
+RUN_PATTERN_IN = json.dumps({
+    "cmd": "fromCtlr",
+    "runPattern": {"file": "Christmas/Tree", "data": "", "id": "", "state": 1, "zoneName": ZONES},
+})
+PATTERN_DATA_IN = json.dumps({
+    "cmd": "fromCtlr",
+    "patternFileData": {"folders": "Christmas", "name": "Tree", "jsonData": "{\"colors\":[255,0,0]}"},
+})
+
+
+def bench(label, func, n=N):
+    start = time.perf_counter()
+    for _ in range(n):
+        func()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<40} {elapsed / n * 1e9:8.0f} ns/msg")
+
+
+async def abench(label, func, n=N):
+    start = time.perf_counter()
+    for _ in range(n):
+        await func()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<40} {elapsed / n * 1e9:8.0f} ns/msg")
+
+
+def old_run_pattern():
+    return json.dumps({
+        "cmd": "toCtlrSet",
+        "runPattern": {
+            "file": "Christmas/Tree",
+            "data": "",
+            "id": "",
+            "state": 1,
+            "zoneName": ZONES,
+        },
+    })
+
+
+def old_get():
+    return json.dumps({"cmd": "toCtlrGet", "get": [["patternFileData", "Christmas", "Tree"]]})
+
+
+def old_handle(raw):
+    payload = json.loads(raw)
+    if payload.get("cmd") == "fromCtlr":
+        if "patternFileList" in payload:
+            pass
+        if "zones" in payload:
+            pass
+        if "patternFileData" in payload:
+            pass
+        if "runPattern" in payload:
+            pass
+
+
+async def main():
+    print(f"codec backend: {'orjson' if codec.orjson is not None else 'json'}")
+    assert json.loads(old_run_pattern()) == json.loads(
+        codec.encode_run_pattern("Christmas/Tree", "", 1, ZONES)
+    )
+
+    bench("before: runPattern json.dumps(dict)", old_run_pattern)
+    bench("after:  runPattern template", lambda: codec.encode_run_pattern("Christmas/Tree", "", 1, ZONES))
+    bench("before: toCtlrGet json.dumps(dict)", old_get)
+    bench("after:  toCtlrGet template", lambda: codec.encode_get([("patternFileData", "Christmas", "Tree")]))
+
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = HomeAssistant(config_dir)
+        client = JellyfishClient(hass, "bench")
+        # Prime the zone state model so the timed pushes are no-op updates.
+        await client._handle_message(RUN_PATTERN_IN)
+
+        bench("before: patternFileData inbound", lambda: old_handle(PATTERN_DATA_IN))
+        await abench("after:  patternFileData inbound", lambda: client._handle_message(PATTERN_DATA_IN))
+        # Not handled at all before; includes the zone state model update.
+        await abench("after:  runPattern push (8 zones)", lambda: client._handle_message(RUN_PATTERN_IN))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,76 @@
+"""Discovery scan of a /24 against local stand-in controllers.
+
+Every 127.0.0.x address is loopback on Linux, so a whole /24 can be scanned
+locally:
+
+  * a few addresses run the controller simulator (found)
+  * some accept TCP but never answer (silent hosts, each costs a full timeout)
+  * the rest refuse the connection at once
+
+Compares the bounded-parallel scan with probing one host after another.
+
+Run from the repository root in an environment with Home Assistant installed
+(Linux, for the 127.0.0.0/8 loopback range):
+
+    python benchmarks/bench_discovery.py
+"""
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from aiohttp import ClientSession  # noqa: E402
+
+from custom_components.jellyfish_lighting.discovery import (  # noqa: E402
+    async_discover,
+    async_probe,
+    parse_hosts,
+)
+from simulator import JellyfishSimulator  # noqa: E402
+
+PORT = 19000
+CONTROLLERS = ["127.0.0.10", "127.0.0.20", "127.0.0.30"]
+SILENT = [f"127.0.0.{i}" for i in range(100, 140)]
+TIMEOUT = 1.0
+
+
+async def _silent(reader, writer):
+    # Accept and say nothing, like a host that drops the handshake.
+    await reader.read()
+    writer.close()
+
+
+async def main():
+    sims = [JellyfishSimulator(zones=4, host=host, port=PORT) for host in CONTROLLERS]
+    for sim in sims:
+        await sim.start()
+    servers = [await asyncio.start_server(_silent, host, PORT) for host in SILENT]
+    hosts = parse_hosts("127.0.0.0/24")
+    try:
+        async with ClientSession() as session:
+            for parallelism in (16, 64, 254):
+                start = time.perf_counter()
+                found = await async_discover(session, hosts, PORT, TIMEOUT, parallelism)
+                elapsed = time.perf_counter() - start
+                print(
+                    f"/24, {len(SILENT)} silent, parallelism {parallelism:<4}"
+                    f" {elapsed:6.2f} s   found {sorted(c.host for c in found)}"
+                )
+            # One host after another, as a loop of probes would.
+            start = time.perf_counter()
+            for host in SILENT[:5]:
+                await async_probe(session, host, PORT, TIMEOUT)
+            per_host = (time.perf_counter() - start) / 5
+            print(f"sequential, estimated for the same /24        {per_host * len(SILENT):6.2f} s")
+    finally:
+        for server in servers:
+            server.close()
+        for sim in sims:
+            await sim.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,233 @@
+"""End-to-end client benchmarks against the local controller simulator.
+
+Measures, over a real websocket on localhost:
+
+  * command round trip: run_pattern call until the controller applied it, and
+    a patternFileData get until the reply resolved
+  * throughput of many parallel zone commands, with and without slow reads
+  * startup to entities: connect until zones are known (cold) and restore
+    until zones are known (warm, from the snapshot store)
+  * reconnect recovery: controller drops the connection until the client is
+    connected again and a command lands
+
+Run from the repository root in an environment with Home Assistant installed:
+
+    python benchmarks/bench_e2e.py
+"""
+import asyncio
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from homeassistant.core import HomeAssistant, callback  # noqa: E402
+from homeassistant.helpers.dispatcher import async_dispatcher_connect  # noqa: E402
+from homeassistant.helpers.storage import Store  # noqa: E402
+
+from custom_components.jellyfish_lighting.const import DOMAIN, SIGNAL_ZONES_UPDATED  # noqa: E402
+from custom_components.jellyfish_lighting.websocket_api import JellyfishClient  # noqa: E402
+from simulator import JellyfishSimulator  # noqa: E402
+
+
+def report(label, samples, unit="ms", scale=1e3):
+    samples = sorted(samples)
+    p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+    print(
+        f"{label:<44} median {statistics.median(samples) * scale:8.2f} {unit}"
+        f"   p95 {p95 * scale:8.2f} {unit}   n={len(samples)}"
+    )
+
+
+class AppliedWaiter:
+    # Resolves futures when the simulator applies a given file to a zone.
+    def __init__(self, sim: JellyfishSimulator):
+        self._waiting = {}
+        sim.apply_listeners.append(self._applied)
+
+    def expect(self, zone, file):
+        fut = asyncio.get_running_loop().create_future()
+        self._waiting[(zone, file)] = fut
+        return fut
+
+    def _applied(self, zone, state, now):
+        fut = self._waiting.pop((zone, state["file"]), None)
+        if fut is not None and not fut.done():
+            fut.set_result(now)
+
+
+async def wait_zones(hass, client):
+    # Entities are created from the zones_updated signal, so the first one
+    # for this client marks the point entities would exist.
+    if client.zones:
+        return
+    done = asyncio.get_running_loop().create_future()
+
+    @callback
+    def _updated(updated, delta):
+        if updated is client and not done.done():
+            done.set_result(None)
+
+    unsub = async_dispatcher_connect(hass, SIGNAL_ZONES_UPDATED, _updated)
+    try:
+        await done
+    finally:
+        unsub()
+
+
+async def connected(hass, sim, **kwargs):
+    client = JellyfishClient(hass, sim.host, sim.port, **kwargs)
+    await client.connect()
+    await wait_zones(hass, client)
+    return client
+
+
+async def bench_round_trip(hass, latency):
+    sim = JellyfishSimulator(zones=8, patterns=200, latency=latency)
+    await sim.start()
+    client = await connected(hass, sim)
+    waiter = AppliedWaiter(sim)
+    zone = next(iter(sim.zones))
+    files = [client.catalog.file_for(name) for name in client.catalog.names[:2]]
+
+    samples = []
+    for i in range(200):
+        file = files[i % 2]
+        fut = waiter.expect(zone, file)
+        start = time.monotonic()
+        await client.run_pattern(file=file, zone_names=[zone])
+        samples.append(await fut - start)
+    report(f"runPattern applied (latency {latency * 1e3:.0f} ms)", samples)
+
+    samples = []
+    for name in client.catalog.names[:200]:
+        folder, _, filename = client.catalog.file_for(name).partition("/")
+        start = time.perf_counter()
+        await client.get_pattern_file_data(folder, filename)
+        samples.append(time.perf_counter() - start)
+    report(f"patternFileData get (latency {latency * 1e3:.0f} ms)", samples)
+
+    await client.disconnect()
+    await sim.stop()
+
+
+async def bench_parallel(hass, zones, read_delay=0.0, rounds=20):
+    sim = JellyfishSimulator(zones=zones, patterns=zones * 2, read_delay=read_delay)
+    await sim.start()
+    client = await connected(hass, sim)
+    waiter = AppliedWaiter(sim)
+    names = list(client.zones)
+    files = [client.catalog.file_for(name) for name in client.catalog.names]
+
+    frames_before = sim.run_pattern_frames
+    start = time.perf_counter()
+    for r in range(rounds):
+        # A different pattern per zone, so nothing can be coalesced but the
+        # writes themselves.
+        assigned = {zone: files[(i + r) % len(files)] for i, zone in enumerate(names)}
+        last = [waiter.expect(zone, file) for zone, file in assigned.items()]
+        await asyncio.gather(
+            *(client.run_pattern(file=file, zone_names=[zone]) for zone, file in assigned.items())
+        )
+    # Superseded frames never reach the controller; the last round must.
+    await asyncio.gather(*last)
+    elapsed = time.perf_counter() - start
+    commands = rounds * zones
+    label = f"{zones} zones x {rounds} rounds"
+    if read_delay:
+        label += f", slow reads {read_delay * 1e3:.0f} ms"
+    print(
+        f"{label:<44} {commands / elapsed:8.0f} cmd/s   "
+        f"{sim.run_pattern_frames - frames_before} frames   "
+        f"queue {client.queue_stats}"
+    )
+
+    # One pattern to every zone at once collapses into a single frame.
+    frames_before = sim.run_pattern_frames
+    fut = waiter.expect(names[-1], files[0])
+    start = time.perf_counter()
+    await asyncio.gather(*(client.run_pattern(file=files[0], zone_names=[zone]) for zone in names))
+    await fut
+    print(
+        f"{f'{zones} zones, same pattern':<44} {(time.perf_counter() - start) * 1e3:8.2f} ms     "
+        f"{sim.run_pattern_frames - frames_before} frames"
+    )
+
+    await client.disconnect()
+    await sim.stop()
+
+
+async def bench_startup(hass, zones, patterns, runs=10):
+    sim = JellyfishSimulator(zones=zones, patterns=patterns)
+    await sim.start()
+
+    cold = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        client = await connected(hass, sim)
+        cold.append(time.perf_counter() - start)
+        await client.disconnect()
+    report(f"cold start, {zones} zones/{patterns} patterns", cold)
+
+    store = Store(hass, 1, f"{DOMAIN}.bench.snapshot")
+    client = JellyfishClient(hass, sim.host, sim.port, snapshot_store=store)
+    await client.connect()
+    await wait_zones(hass, client)
+    await store.async_save({"zones": client.zones, "patterns": client.patterns})
+    await client.disconnect()
+
+    warm = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        client = JellyfishClient(hass, sim.host, sim.port, snapshot_store=store)
+        await client.async_restore_snapshot()
+        await wait_zones(hass, client)
+        warm.append(time.perf_counter() - start)
+    report(f"warm start (snapshot), {zones} zones", warm)
+
+    await store.async_remove()
+    await sim.stop()
+
+
+async def bench_reconnect(hass, runs=5):
+    sim = JellyfishSimulator(zones=8, patterns=50)
+    await sim.start()
+    client = await connected(hass, sim)
+    waiter = AppliedWaiter(sim)
+    zone = next(iter(sim.zones))
+    files = [client.catalog.file_for(name) for name in client.catalog.names[:runs]]
+
+    samples = []
+    for file in files:
+        await sim.drop_connections()
+        while client._connected_event.is_set():
+            await asyncio.sleep(0)
+        fut = waiter.expect(zone, file)
+        start = time.monotonic()
+        # Issued while disconnected; held in the outbox until the link is back.
+        await client.run_pattern(file=file, zone_names=[zone])
+        samples.append(await fut - start)
+    report("reconnect to first command applied", samples, unit="s ", scale=1)
+
+    await client.disconnect()
+    await sim.stop()
+
+
+async def main():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        hass = HomeAssistant(tmpdir)
+        await bench_round_trip(hass, latency=0.0)
+        await bench_round_trip(hass, latency=0.005)
+        await bench_parallel(hass, zones=8)
+        await bench_parallel(hass, zones=64)
+        await bench_parallel(hass, zones=64, read_delay=0.002)
+        await bench_startup(hass, zones=16, patterns=2000)
+        await bench_reconnect(hass)
+        await hass.async_stop(force=True)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
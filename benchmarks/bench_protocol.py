@@ -0,0 +1,104 @@
+"""Per-message cost of the protocol core, without sockets or an event loop.
+
+Feeds controller frames straight into JellyfishProtocol and drives its
+outbound queue by hand, so the numbers are the state machine alone: decode,
+handler routing, zone state and echo tracking, queue bookkeeping and metrics.
+
+Run from the repository root in an environment with Home Assistant installed
+(importing the package pulls it in):
+
+    python benchmarks/bench_protocol.py
+"""
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from custom_components.jellyfish_lighting.models import ZoneState  # noqa: E402
+from custom_components.jellyfish_lighting.protocol import JellyfishProtocol  # noqa: E402
+
+N = 200_000
+ZONES = [f"Zone {i}" for i in range(8)]
+PATTERNS = [
+    {"folders": f"Folder {i // 50}", "name": f"Pattern {i}", "readOnly": False}
+    for i in range(2000)
+]
+
+
+def from_ctlr(**payload):
+    return json.dumps({"cmd": "fromCtlr", **payload})
+
+
+def run_pattern_in(file):
+    return from_ctlr(
+        runPattern={"file": file, "data": "", "id": "", "state": 1, "zoneName": ZONES}
+    )
+
+
+RUN_PATTERN_IN = run_pattern_in("Christmas/Tree")
+PATTERN_DATA_IN = from_ctlr(
+    patternFileData={"folders": "Christmas", "name": "Tree", "jsonData": "{\"colors\":[255,0,0]}"}
+)
+ZONES_IN = from_ctlr(zones={zone: {"numPixels": 100} for zone in ZONES})
+
+
+def bench(label, func, n=N):
+    start = time.perf_counter()
+    for i in range(n):
+        func(i)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<44} {elapsed / n * 1e9:8.0f} ns/op")
+
+
+def main():
+    protocol = JellyfishProtocol("bench", max_queue=N)
+    protocol.connection_made(0.0)
+    while protocol.pop_frame() is not None:
+        pass
+    protocol.receive(ZONES_IN, 0.0)
+    protocol.pop_frame()
+    # Prime the zone state model so the timed pushes are no-op updates.
+    protocol.receive(RUN_PATTERN_IN, 0.0)
+
+    bench("receive patternFileData reply", lambda i: protocol.receive(PATTERN_DATA_IN, 0.0))
+    bench("receive runPattern push, unchanged", lambda i: protocol.receive(RUN_PATTERN_IN, 0.0))
+    changing = [run_pattern_in(f"Christmas/Tree {i}") for i in range(64)]
+    bench("receive runPattern push, changed", lambda i: protocol.receive(changing[i % 64], 0.0))
+
+    def queue_and_write(i):
+        frame, key = protocol.run_pattern_frame("Christmas/Tree", "", 1, ZONES)
+        protocol.queue(frame, key, None, 0.0)
+        key, frame, _, queued = protocol.pop_frame()
+        protocol.frame_written(key, frame, queued, 0.0)
+
+    bench("runPattern frame, queue and write", queue_and_write)
+
+    files = [f"Christmas/Tree {i}" for i in range(64)]
+    echoes = [run_pattern_in(file) for file in files]
+
+    def command_cycle(i):
+        # A command that changes state, written and then echoed back.
+        file = files[i % 64]
+        zones = protocol.filter_run_pattern(file, "", 1, ZONES)
+        frame, key = protocol.run_pattern_frame(file, "", 1, zones)
+        protocol.queue(frame, key, None, 0.0)
+        key, frame, _, queued = protocol.pop_frame()
+        protocol.frame_written(key, frame, queued, 0.0)
+        protocol.run_pattern_written(zones, ZoneState(file, "", 1), 0.0)
+        protocol.receive(echoes[i % 64], 0.0)
+
+    bench("full command cycle with echo (8 zones)", command_cycle)
+    bench(
+        "suppressed duplicate command",
+        lambda i: protocol.filter_run_pattern(files[-1], "", 1, ZONES),
+    )
+
+    lists = [from_ctlr(patternFileList=PATTERNS), from_ctlr(patternFileList=PATTERNS[:-1])]
+    bench("receive patternFileList (2000), changed", lambda i: protocol.receive(lists[i % 2], 0.0), 200)
+    print(f"decode stats: {protocol.decode_stats['runPattern']['count']} runPattern frames")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+"""Local stand-in for a Jellyfish controller.
+
+Speaks the subset of the controller websocket protocol the integration uses:
+toCtlrGet (patternFileList, zones, patternFileData, runPattern) and toCtlrSet
+runPattern, answering with fromCtlr messages and broadcasting zone changes to
+every connected client like the real controller does.
+
+Faults can be injected to exercise the client: reply latency, slow reads and
+dropped connections.
+
+    python benchmarks/simulator.py --port 9000 --zones 20 --patterns 500
+"""
+import argparse
+import asyncio
+import json
+import logging
+import time
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from aiohttp import WSMsgType, web
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class JellyfishSimulator:
+    def __init__(
+        self,
+        zones: int = 8,
+        patterns: int = 100,
+        folders: int = 10,
+        pixels: int = 150,
+        latency: float = 0.0,
+        read_delay: float = 0.0,
+        drop_after: int = 0,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        self.host = host
+        self.port = port
+        # Seconds before each reply, seconds spent per inbound frame, and
+        # close the connection after this many inbound frames (0 = never).
+        self.latency = latency
+        self.read_delay = read_delay
+        self.drop_after = drop_after
+        self.zones: Dict[str, Dict[str, Any]] = {
+            f"Zone {i + 1}": {"numPixels": pixels, "portMap": [{"ctlrName": "sim", "phyPort": i + 1}]}
+            for i in range(zones)
+        }
+        self.patterns: List[Dict[str, Any]] = []
+        for f in range(folders):
+            self.patterns.append({"folders": f"Folder {f + 1}", "name": "", "readOnly": False})
+        for p in range(patterns):
+            self.patterns.append(
+                {"folders": f"Folder {p % folders + 1}", "name": f"Pattern {p + 1}", "readOnly": False}
+            )
+        self.zone_states: Dict[str, Dict[str, Any]] = {
+            zone: {"file": "", "data": "", "id": "", "state": 0} for zone in self.zones
+        }
+        self.frames_in = 0
+        self.frames_out = 0
+        self.run_pattern_frames = 0
+        self.connections = 0
+        # Called with (zone, state dict, monotonic time) for every zone a
+        # runPattern is applied to.
+        self.apply_listeners: List[Callable[[str, Dict[str, Any], float], None]] = []
+        self._clients: Set[web.WebSocketResponse] = set()
+        self._runner: Optional[web.AppRunner] = None
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_get("/", self._handle)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        if not self.port:
+            self.port = site._server.sockets[0].getsockname()[1]
+        _LOGGER.info("Jellyfish simulator listening on %s:%s", self.host, self.port)
+
+    async def stop(self):
+        await self.drop_connections()
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def drop_connections(self):
+        for ws in list(self._clients):
+            await ws.close()
+
+    async def _handle(self, request: web.Request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        self.connections += 1
+        self._clients.add(ws)
+        received = 0
+        try:
+            async for msg in ws:
+                if msg.type != WSMsgType.TEXT:
+                    continue
+                self.frames_in += 1
+                received += 1
+                if self.read_delay:
+                    await asyncio.sleep(self.read_delay)
+                try:
+                    payload = json.loads(msg.data)
+                except ValueError:
+                    continue
+                await self._dispatch(ws, payload)
+                if self.drop_after and received >= self.drop_after:
+                    await ws.close()
+                    break
+        finally:
+            self._clients.discard(ws)
+        return ws
+
+    async def _reply(self, ws: web.WebSocketResponse, payload: Dict[str, Any]):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if ws.closed:
+            return
+        await ws.send_str(json.dumps({"cmd": "fromCtlr", **payload}))
+        self.frames_out += 1
+
+    async def _dispatch(self, ws: web.WebSocketResponse, payload: Dict[str, Any]):
+        cmd = payload.get("cmd")
+        if cmd == "toCtlrGet":
+            for item in payload.get("get", []):
+                reply = self._get(item)
+                if reply is not None:
+                    await self._reply(ws, reply)
+        elif cmd == "toCtlrSet" and "runPattern" in payload:
+            self.run_pattern_frames += 1
+            run = payload["runPattern"]
+            now = time.monotonic()
+            state = {key: run.get(key, "") for key in ("file", "data", "id")}
+            state["state"] = run.get("state", 0)
+            zones = [zone for zone in run.get("zoneName", []) if zone in self.zones]
+            for zone in zones:
+                self.zone_states[zone] = dict(state)
+                for listener in self.apply_listeners:
+                    listener(zone, state, now)
+            # The controller tells every client about the change.
+            broadcast = {"runPattern": {**state, "zoneName": zones}}
+            for client in list(self._clients):
+                await self._reply(client, broadcast)
+
+    def _get(self, item: List[Any]) -> Optional[Dict[str, Any]]:
+        kind = item[0] if item else None
+        if kind == "patternFileList":
+            return {"patternFileList": self.patterns}
+        if kind == "zones":
+            return {"zones": self.zones}
+        if kind == "patternFileData" and len(item) == 3:
+            folder, name = item[1], item[2]
+            return {
+                "patternFileData": {
+                    "folders": folder,
+                    "name": name,
+                    "jsonData": json.dumps(self.pattern_json(folder, name)),
+                }
+            }
+        if kind == "runPattern" and len(item) == 2 and item[1] in self.zone_states:
+            return {"runPattern": {**self.zone_states[item[1]], "zoneName": [item[1]]}}
+        return None
+
+    @staticmethod
+    def pattern_json(folder: str, name: str) -> Dict[str, Any]:
+        seed = sum(map(ord, folder + name))
+        return {
+            "colors": [seed % 256, (seed * 7) % 256, (seed * 13) % 256, 255, 255, 255],
+            "spaceBetweenPixels": 2,
+            "effectBetweenPixels": "No Color Transform",
+            "type": "Color",
+            "skip": 2,
+            "numOfLeds": 1,
+            "runData": {
+                "speed": 10,
+                "brightness": 100,
+                "effect": "No Effect",
+                "effectValue": 0,
+                "rgbAdj": [100, 100, 100],
+            },
+            "direction": "Left",
+        }
+
+
+async def _main(args):
+    sim = JellyfishSimulator(
+        zones=args.zones,
+        patterns=args.patterns,
+        latency=args.latency,
+        read_delay=args.read_delay,
+        drop_after=args.drop_after,
+        host=args.host,
+        port=args.port,
+    )
+    await sim.start()
+    print(f"Simulating a Jellyfish controller on ws://{sim.host}:{sim.port}/")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await sim.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--zones", type=int, default=8)
+    parser.add_argument("--patterns", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--read-delay", type=float, default=0.0)
+    parser.add_argument("--drop-after", type=int, default=0)
+    logging.basicConfig(level=logging.INFO)
+    try:
+        asyncio.run(_main(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
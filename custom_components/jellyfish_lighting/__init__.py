@@ -2,70 +2,95 @@ import asyncio
 import logging
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
-from homeassistant.const import CONF_HOST, CONF_PORT
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.const import CONF_HOST, CONF_PORT, EVENT_HOMEASSISTANT_STOP
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+from homeassistant.helpers.storage import Store
 
-from .const import DOMAIN, PLATFORMS, DEFAULT_PORT, SERVICE_RUN_PATTERN, SERVICE_RUN_PATTERN_ADV, SERVICE_GET_PATTERN_DATA
+from .const import (
+    DOMAIN,
+    PLATFORMS,
+    DEFAULT_PORT,
+    DATA_HUB,
+    DATA_SCENES,
+    DATA_ZONE_REGISTRY,
+    SIGNAL_ZONES_UPDATED,
+    SNAPSHOT_STORAGE_VERSION,
+)
+from .animation import AnimationScheduler
+from .browse import async_setup_websocket_commands
+from .cache import PatternDataCache
+from .hub import JellyfishHub
+from .mirror import PatternMirror
+from .registry import ZoneRegistry
+from .scenes import SceneStore
+from .services import async_setup_services
 from .websocket_api import JellyfishClient
 
 _LOGGER = logging.getLogger(__name__)
 
 async def async_setup(hass: HomeAssistant, config: dict):
     hass.data.setdefault(DOMAIN, {})
+    registry = ZoneRegistry()
+    hub = JellyfishHub(hass, registry)
+    hass.data[DOMAIN][DATA_ZONE_REGISTRY] = registry
+    hass.data[DOMAIN][DATA_HUB] = hub
+
+    async def _async_shutdown(event):
+        await hub.async_shutdown()
+
+    # Entries are not unloaded at shutdown; stop reconnecting before HA's
+    # shared session closes under the clients.
+    hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, _async_shutdown)
+
+    scenes = SceneStore(hass)
+    await scenes.async_load()
+    hass.data[DOMAIN][DATA_SCENES] = scenes
+    # Services are domain-wide and route zones to their controller through
+    # the zone registry, so they are registered once here.
+    async_setup_services(hass)
+    async_setup_websocket_commands(hass)
     return True
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry):
     host = entry.data.get(CONF_HOST)
     port = entry.data.get(CONF_PORT, DEFAULT_PORT)
-    client = JellyfishClient(hass, host, port)
-    await client.connect()
+    pattern_cache = PatternDataCache(hass, entry.entry_id)
+    await pattern_cache.async_load()
+    hub: JellyfishHub = hass.data[DOMAIN][DATA_HUB]
+    client = hub.async_create_client(
+        entry.entry_id,
+        host,
+        port,
+        pattern_cache=pattern_cache,
+        snapshot_store=_snapshot_store(hass, entry),
+    )
+    # Entities are created from the last known zones/patterns; the live
+    # refresh runs in the background so an offline controller cannot stall
+    # startup.
+    await client.async_restore_snapshot()
 
     hass.data[DOMAIN][entry.entry_id] = {
         "client": client,
-        "entry": entry
+        "entry": entry,
+        "animations": AnimationScheduler(client),
+        "mirror": PatternMirror(hass, client),
     }
 
-    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    registry = hub.registry
+    registry.async_update_client(client)
+
+    @callback
+    def _async_zones_updated(updated: JellyfishClient, delta):
+        if updated is client:
+            registry.async_update_client(client)
 
-    # Register services
-    async def async_run_pattern(call):
-        await client.run_pattern(
-            file=call.data.get("file", ""),
-            zone_names=call.data.get("zone_names", []),
-            state=call.data.get("state", 1),
-        )
-
-    async def async_run_pattern_adv(call):
-        await client.run_pattern_advanced(
-            data=call.data.get("data", ""),
-            zone_names=call.data.get("zone_names", []),
-            state=call.data.get("state", 1),
-        )
-
-    async def async_get_pattern_data(call):
-        folder = call.data.get("folder")
-        filename = call.data.get("filename")
-        return await client.get_pattern_file_data(folder, filename)
-
-    async def async_set_zone_pattern(call):
-        zone = call.data.get("zone")
-        pattern = call.data.get("pattern")
-        # Find the entity for the zone
-        for entry_id, data in hass.data[DOMAIN].items():
-            client = data["client"]
-            for zone_name in client.zones.keys():
-                if zone_name == zone:
-                    # Find the entity instance
-                    for entity in hass.data[DOMAIN][entry_id].get("entities", []):
-                        if getattr(entity, "_zone_name", None) == zone:
-                            await entity.async_set_pattern(pattern)
-                            return
-        _LOGGER.warning(f"Zone '{zone}' not found for pattern set")
-
-    hass.services.async_register(DOMAIN, SERVICE_RUN_PATTERN, async_run_pattern)
-    hass.services.async_register(DOMAIN, SERVICE_RUN_PATTERN_ADV, async_run_pattern_adv)
-    hass.services.async_register(DOMAIN, SERVICE_GET_PATTERN_DATA, async_get_pattern_data)
-    hass.services.async_register(DOMAIN, "set_zone_pattern", async_set_zone_pattern)
+    entry.async_on_unload(
+        async_dispatcher_connect(hass, SIGNAL_ZONES_UPDATED, _async_zones_updated)
+    )
+
+    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    hub.async_start(entry.entry_id)
 
     return True
 
@@ -73,6 +98,13 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry):
     data = hass.data[DOMAIN].pop(entry.entry_id, None)
     if not data:
         return True
-    client: JellyfishClient = data["client"]
-    await client.disconnect()
+    data["animations"].stop()
+    await hass.data[DOMAIN][DATA_HUB].async_remove(entry.entry_id)
     return await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry):
+    await PatternDataCache(hass, entry.entry_id).async_remove()
+    await _snapshot_store(hass, entry).async_remove()
+
+def _snapshot_store(hass: HomeAssistant, entry: ConfigEntry) -> Store:
+    return Store(hass, SNAPSHOT_STORAGE_VERSION, f"{DOMAIN}.{entry.entry_id}.snapshot")
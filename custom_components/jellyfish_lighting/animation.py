@@ -0,0 +1,178 @@
+import asyncio
+import logging
+import time
+from typing import Callable, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+from .const import ANIMATION_ACK_TIMEOUT, DEFAULT_ANIMATION_FPS
+from .models import ZoneState
+from .pattern import Pattern
+from .websocket_api import JellyfishClient
+
+_LOGGER = logging.getLogger(__name__)
+
+# Maps animation progress (0.0 to 1.0) to the pattern to show.
+FrameFunction = Callable[[float], Pattern]
+
+
+class _Animation:
+    __slots__ = ("zones", "frame_fn", "start", "duration", "future")
+
+    def __init__(self, zones: FrozenSet[str], frame_fn: FrameFunction, duration: float, future):
+        self.zones = zones
+        self.frame_fn = frame_fn
+        self.start = time.monotonic()
+        self.duration = duration
+        self.future = future
+
+
+class AnimationScheduler:
+    # Drives time-based zone animations for one controller. Every tick the
+    # current frame of each running animation is computed, zones showing the
+    # same frame share one runPattern, and the tick is dropped outright while
+    # the previous frames are unwritten or not yet echoed by the controller,
+    # so neither the link nor the controller builds a backlog.
+    def __init__(self, client: JellyfishClient, fps: float = DEFAULT_ANIMATION_FPS):
+        self.client = client
+        self.fps = fps
+        self._animations: List[_Animation] = []
+        # (write future, a zone, its state when sent, time sent) per frame,
+        # and the frame data each animating zone was last sent.
+        self._inflight: List[Tuple[asyncio.Future, str, Optional[ZoneState], float]] = []
+        self._shown: Dict[str, str] = {}
+        self._task: Optional[asyncio.Task] = None
+        self.ticks = 0
+        self.frames_sent = 0
+        self.frames_dropped = 0
+        # A command for an animating zone ends its animation, so no later
+        # frame can undo it.
+        client.async_add_command_listener(self.cancel)
+
+    @property
+    def stats(self) -> Dict[str, float]:
+        return {
+            "fps": self.fps,
+            "animations": len(self._animations),
+            "ticks": self.ticks,
+            "frames_sent": self.frames_sent,
+            "frames_dropped": self.frames_dropped,
+        }
+
+    def is_animating(self, zone: str) -> bool:
+        return any(zone in animation.zones for animation in self._animations)
+
+    async def animate(
+        self, zone_names: Iterable[str], frame_fn: FrameFunction, duration: float
+    ) -> bool:
+        # Returns True once the last frame is queued, False if the zones were
+        # taken over by another animation, a frame failed or the scheduler
+        # was stopped.
+        zones = frozenset(zone_names)
+        if not zones:
+            return True
+        self.cancel(zones)
+        future = asyncio.get_running_loop().create_future()
+        self._animations.append(_Animation(zones, frame_fn, max(duration, 0.0), future))
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        return await asyncio.shield(future)
+
+    def cancel(self, zone_names: Iterable[str]):
+        zones = frozenset(zone_names)
+        for animation in list(self._animations):
+            if animation.zones & zones:
+                # Zones move to the newer animation; the rest keep going.
+                animation.zones = animation.zones - zones
+                if not animation.zones:
+                    self._finish(animation, False)
+
+    def stop(self):
+        for animation in list(self._animations):
+            self._finish(animation, False)
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def _finish(self, animation: _Animation, result: bool):
+        self._animations.remove(animation)
+        if not animation.future.done():
+            animation.future.set_result(result)
+
+    async def _run(self):
+        interval = 1 / self.fps
+        next_tick = time.monotonic()
+        try:
+            while self._animations:
+                now = time.monotonic()
+                self.ticks += 1
+                if not self.client.connected:
+                    # Frames would only pile up for a link that is down.
+                    for animation in list(self._animations):
+                        self._finish(animation, False)
+                    break
+                if self._busy(now):
+                    self.frames_dropped += 1
+                else:
+                    self._tick(now)
+                next_tick += interval
+                if next_tick < now:
+                    # Fell behind (e.g. a long executor job); skip missed
+                    # ticks instead of bursting to catch up.
+                    self.frames_dropped += int((now - next_tick) / interval)
+                    next_tick = now + interval
+                await asyncio.sleep(next_tick - time.monotonic())
+        finally:
+            self._inflight = []
+            self._shown = {}
+
+    def _busy(self, now: float) -> bool:
+        zone_states = self.client.zone_states
+        for fut, zone, before, sent in self._inflight:
+            if not fut.done():
+                return True
+            # The controller echoes runPattern; any new state for the zone
+            # means it has caught up. Do not wait forever for one that does
+            # not echo.
+            if fut.result() and zone_states.get(zone) == before:
+                if now - sent < ANIMATION_ACK_TIMEOUT:
+                    return True
+        return False
+
+    def _tick(self, now: float):
+        frames: Dict[str, List[str]] = {}
+        finished = {}
+        for animation in self._animations:
+            if animation.duration:
+                progress = min(1.0, (now - animation.start) / animation.duration)
+            else:
+                progress = 1.0
+            try:
+                data = animation.frame_fn(progress).json
+            except Exception:  # noqa: BLE001
+                _LOGGER.exception("Animation frame failed for %s", sorted(animation.zones))
+                finished[animation] = False
+                continue
+            # Slow ramps repeat frames; zones already showing one skip it.
+            zones = [zone for zone in animation.zones if self._shown.get(zone) != data]
+            if zones:
+                frames.setdefault(data, []).extend(zones)
+            if progress >= 1.0:
+                finished[animation] = True
+        zone_states = self.client.zone_states
+        self._inflight = []
+        for data, zones in frames.items():
+            self._inflight.append(
+                (self.client.send_frame(data, zones), zones[0], zone_states.get(zones[0]), now)
+            )
+            self._shown.update(dict.fromkeys(zones, data))
+        self.frames_sent += len(self._inflight)
+        for animation, result in finished.items():
+            self._finish(animation, result)
+
+
+def fade(pattern: Pattern, start: int, end: int) -> FrameFunction:
+    # Brightness ramp over an otherwise fixed pattern.
+    def frame(progress: float) -> Pattern:
+        brightness = round(start + (end - start) * progress)
+        return pattern.replace(run_data=pattern.run_data._replace(brightness=brightness))
+
+    return frame
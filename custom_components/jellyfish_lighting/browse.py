@@ -0,0 +1,76 @@
+import logging
+from typing import Any, Dict
+
+import voluptuous as vol
+
+# Aliased: this package's own websocket_api module is the controller client.
+from homeassistant.components import websocket_api as ha_websocket_api
+from homeassistant.core import HomeAssistant, callback
+
+from .const import DOMAIN, DATA_ZONE_REGISTRY, DEFAULT_PATTERN_PAGE_SIZE, MAX_PATTERN_PAGE_SIZE
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@callback
+def async_setup_websocket_commands(hass: HomeAssistant):
+    ha_websocket_api.async_register_command(hass, websocket_list_patterns)
+
+
+@ha_websocket_api.websocket_command(
+    {
+        vol.Required("type"): "jellyfish/patterns",
+        vol.Optional("host"): str,
+        vol.Optional("folder"): str,
+        vol.Optional("search"): str,
+        vol.Optional("offset", default=0): vol.All(int, vol.Range(min=0)),
+        vol.Optional("limit", default=DEFAULT_PATTERN_PAGE_SIZE): vol.All(
+            int, vol.Range(min=1, max=MAX_PATTERN_PAGE_SIZE)
+        ),
+    }
+)
+@callback
+def websocket_list_patterns(
+    hass: HomeAssistant, connection: ha_websocket_api.ActiveConnection, msg: Dict[str, Any]
+):
+    # One page of a controller's pattern catalog, optionally limited to a
+    # folder and/or names containing `search`, so a frontend can browse
+    # large libraries without the catalog living in entity state.
+    clients = hass.data[DOMAIN][DATA_ZONE_REGISTRY].clients
+    host = msg.get("host")
+    if host:
+        clients = [client for client in clients if client.host == host]
+    if len(clients) != 1:
+        connection.send_error(
+            msg["id"],
+            ha_websocket_api.ERR_NOT_FOUND,
+            f"No Jellyfish controller at {host}" if host else "Several controllers; pass host",
+        )
+        return
+    client = clients[0]
+    catalog = client.catalog
+    folder = msg.get("folder")
+    search = (msg.get("search") or "").casefold()
+    if folder is None and not search:
+        entries = catalog.entries
+    else:
+        entries = [
+            entry for entry in catalog.entries
+            if (folder is None or entry[0] == folder) and search in entry[1].casefold()
+        ]
+    offset = msg["offset"]
+    page = entries[offset:offset + msg["limit"]]
+    connection.send_result(
+        msg["id"],
+        {
+            "host": client.host,
+            "version": catalog.version,
+            "folders": list(catalog.folders),
+            "total": len(entries),
+            "offset": offset,
+            "patterns": [
+                {"folder": entry_folder, "name": name, "file": f"{entry_folder}/{name}"}
+                for entry_folder, name in page
+            ],
+        },
+    )
@@ -0,0 +1,123 @@
+import json
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import (
+    DOMAIN,
+    CACHE_STORAGE_VERSION,
+    CACHE_SAVE_DELAY,
+    DEFAULT_CACHE_MAX_ENTRIES,
+    DEFAULT_CACHE_MAX_BYTES,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class PatternDataCache:
+    # LRU cache of patternFileData payloads keyed by (folder, name), persisted
+    # with HA storage so it survives restarts. Each entry remembers the
+    # catalog signature it was fetched under so a changed listing drops it.
+    # The listing entry only carries folder, name and readOnly, so an edit
+    # of a file's content is not seen here: such an entry stays until it is
+    # evicted, the file is renamed or removed, or a caller re-fetches it
+    # with get_pattern_file_data(..., refresh=True).
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry_id: str,
+        max_entries: int = DEFAULT_CACHE_MAX_ENTRIES,
+        max_bytes: int = DEFAULT_CACHE_MAX_BYTES,
+    ):
+        self._store = Store(hass, CACHE_STORAGE_VERSION, f"{DOMAIN}.{entry_id}.pattern_cache")
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        # (folder, name) -> (signature, data, size)
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[Optional[str], Dict[str, Any], int]]" = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+    async def async_load(self):
+        stored = await self._store.async_load()
+        if not stored:
+            return
+        for folder, name, signature, data in stored.get("entries", []):
+            self._insert((folder, name), signature, data)
+        _LOGGER.debug("Loaded %d cached pattern files", len(self._entries))
+
+    async def async_remove(self):
+        self._entries.clear()
+        self._bytes = 0
+        await self._store.async_remove()
+
+    @callback
+    def get(self, folder: str, name: str) -> Optional[Dict[str, Any]]:
+        key = (folder, name)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    @callback
+    def put(self, folder: str, name: str, data: Dict[str, Any], signature: Optional[str]):
+        self._insert((folder, name), signature, data)
+        self._schedule_save()
+
+    @callback
+    def invalidate(self, signatures: Mapping[Tuple[str, str], str]):
+        # Drop entries whose file was removed or whose listing entry changed.
+        stale = [
+            key for key, (signature, _, _) in self._entries.items()
+            if signatures.get(key) != signature
+        ]
+        for key in stale:
+            self._pop(key)
+        if stale:
+            _LOGGER.debug("Invalidated %d cached pattern files", len(stale))
+            self._schedule_save()
+
+    def _insert(self, key: Tuple[str, str], signature: Optional[str], data: Dict[str, Any]):
+        self._pop(key)
+        size = len(json.dumps(data))
+        if size > self.max_bytes:
+            return
+        self._entries[key] = (signature, data, size)
+        self._bytes += size
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            self._pop(next(iter(self._entries)))
+
+    def _pop(self, key: Tuple[str, str]):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[2]
+
+    @callback
+    def _schedule_save(self):
+        self._store.async_delay_save(self._data_to_save, CACHE_SAVE_DELAY)
+
+    @callback
+    def _data_to_save(self) -> Dict[str, Any]:
+        # Oldest first, so reloading preserves LRU order.
+        return {
+            "entries": [
+                [folder, name, signature, data]
+                for (folder, name), (signature, data, _) in self._entries.items()
+            ]
+        }
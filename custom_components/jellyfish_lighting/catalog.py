@@ -0,0 +1,56 @@
+import json
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+
+@dataclass(frozen=True)
+class PatternCatalog:
+    # Built once per patternFileList and shared by every entity of a
+    # controller. Treat the mappings as read-only; entities compare `version`
+    # to know when their cached views need rebuilding.
+    version: int = 0
+    folders: Mapping[str, List[str]] = field(default_factory=dict)
+    names: Tuple[str, ...] = ()
+    # Every (folder, name) in listing order, for paging through the catalog.
+    entries: Tuple[Tuple[str, str], ...] = ()
+    by_name: Mapping[str, Tuple[str, str]] = field(default_factory=dict)
+    # (folder, name) -> canonical form of the listing entry. A file whose
+    # signature changes between two lists has been modified on the controller.
+    signatures: Mapping[Tuple[str, str], str] = field(default_factory=dict)
+
+    @classmethod
+    def build(cls, patterns: Iterable[Dict[str, Any]], version: int) -> "PatternCatalog":
+        folders: Dict[str, List[str]] = {}
+        by_name: Dict[str, Tuple[str, str]] = {}
+        signatures: Dict[Tuple[str, str], str] = {}
+        for pat in patterns:
+            folder = pat.get("folders", "Unknown")
+            name = pat.get("name", "Unknown")
+            names = folders.setdefault(folder, [])
+            # The controller lists folders as entries with an empty name.
+            if not name:
+                continue
+            names.append(name)
+            # Bare names resolve to the first folder that has them; the
+            # "folder/name" form is always unambiguous.
+            by_name.setdefault(name, (folder, name))
+            by_name[f"{folder}/{name}"] = (folder, name)
+            signatures[(folder, name)] = json.dumps(pat, sort_keys=True)
+        unique_names = tuple(dict.fromkeys(n for names in folders.values() for n in names))
+        return cls(
+            version=version,
+            # Left as a plain dict: it is exposed as a state attribute.
+            folders=folders,
+            names=unique_names,
+            entries=tuple(signatures),
+            by_name=MappingProxyType(by_name),
+            signatures=MappingProxyType(signatures),
+        )
+
+    def file_for(self, name: Optional[str]) -> Optional[str]:
+        # Map a display name (or "folder/name") to the runPattern file path.
+        entry = self.by_name.get(name) if name else None
+        if entry is None:
+            return None
+        return f"{entry[0]}/{entry[1]}"
@@ -0,0 +1,44 @@
+import json
+from typing import Any, Iterable, List
+
+# orjson ships with Home Assistant; fall back to the standard library when it
+# is missing (e.g. running the protocol code on its own).
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+if orjson is not None:
+    loads = orjson.loads
+
+    def dumps(obj: Any) -> str:
+        return orjson.dumps(obj).decode()
+else:
+    loads = json.loads
+    dumps = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False).encode
+
+# The fixed parts of outbound frames are serialized once; only the variable
+# fields are encoded per message.
+_GET_PREFIX = '{"cmd":"toCtlrGet","get":'
+_RUN_PATTERN_PREFIX = '{"cmd":"toCtlrSet","runPattern":{"file":'
+
+PATTERN_LIST_FRAME = _GET_PREFIX + '[["patternFileList"]]}'
+ZONES_FRAME = _GET_PREFIX + '[["zones"]]}'
+
+
+def encode_get(items: Iterable[Iterable[Any]]) -> str:
+    return _GET_PREFIX + dumps([list(item) for item in items]) + "}"
+
+
+def encode_run_pattern(file: str, data: str, state: int, zone_names: List[str]) -> str:
+    return (
+        _RUN_PATTERN_PREFIX
+        + dumps(file)
+        + ',"data":'
+        + dumps(data)
+        + ',"id":"","state":'
+        + str(int(state))
+        + ',"zoneName":'
+        + dumps(zone_names)
+        + "}}"
+    )
@@ -1,38 +1,151 @@
 import logging
+from typing import Any, Dict, Optional
+
+import voluptuous as vol
+
 from homeassistant import config_entries
 from homeassistant.core import callback
 from homeassistant.const import CONF_HOST, CONF_PORT
-from .const import DOMAIN, DEFAULT_PORT
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+
+from .const import DOMAIN, DEFAULT_PORT, VALIDATE_TIMEOUT
+from .discovery import DiscoveredController, async_discover, async_probe, parse_hosts
 
 _LOGGER = logging.getLogger(__name__)
 
+CONF_HOSTS = "hosts"
+
+
 class JellyfishConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     VERSION = 1
-    CONNECTION_CLASS = config_entries.CONN_CLASS_LOCAL_POLL
+    CONNECTION_CLASS = config_entries.CONN_CLASS_LOCAL_PUSH
+
+    def __init__(self):
+        self._discovered: Dict[str, DiscoveredController] = {}
+        self._controller: Optional[DiscoveredController] = None
 
     async def async_step_user(self, user_input=None):
+        return self.async_show_menu(step_id="user", menu_options=["manual", "discover"])
+
+    async def async_step_manual(self, user_input=None):
+        errors = {}
+        if user_input is not None:
+            host = user_input[CONF_HOST].strip()
+            port = user_input.get(CONF_PORT, DEFAULT_PORT)
+            await self.async_set_unique_id(host)
+            self._abort_if_unique_id_configured()
+            # Entries made before unique ids were set only have the host.
+            self._async_abort_entries_match({CONF_HOST: host})
+            # A typo would otherwise only show up as an endless reconnect loop.
+            controller = await async_probe(
+                async_get_clientsession(self.hass), host, port, VALIDATE_TIMEOUT
+            )
+            if controller is None:
+                errors["base"] = "cannot_connect"
+            else:
+                return self._create_entry(controller)
+
+        return self.async_show_form(
+            step_id="manual",
+            data_schema=self._get_schema(user_input),
+            errors=errors
+        )
+
+    async def async_step_discover(self, user_input=None):
         errors = {}
         if user_input is not None:
-            host = user_input[CONF_HOST]
             port = user_input.get(CONF_PORT, DEFAULT_PORT)
-            # For brevity, we do not connect here; simply save entry.
-            return self.async_create_entry(title=f"Jellyfish {host}", data={
-                CONF_HOST: host,
-                CONF_PORT: port
-            })
+            try:
+                hosts = parse_hosts(user_input[CONF_HOSTS])
+            except ValueError as exc:
+                _LOGGER.debug("Invalid discovery hosts: %s", exc)
+                errors["base"] = "invalid_hosts"
+            else:
+                configured = {
+                    entry.data.get(CONF_HOST) for entry in self._async_current_entries()
+                }
+                found = await async_discover(
+                    async_get_clientsession(self.hass),
+                    [host for host in hosts if host not in configured],
+                    port,
+                )
+                self._discovered = {controller.host: controller for controller in found}
+                if self._discovered:
+                    return await self.async_step_pick()
+                errors["base"] = "no_controllers"
 
         return self.async_show_form(
-            step_id="user",
-            data_schema=self._get_schema(),
+            step_id="discover",
+            data_schema=vol.Schema({
+                vol.Required(CONF_HOSTS): str,
+                vol.Optional(CONF_PORT, default=DEFAULT_PORT): int,
+            }),
             errors=errors
         )
 
+    async def async_step_pick(self, user_input=None):
+        if user_input is not None:
+            controller = self._discovered.pop(user_input[CONF_HOST])
+            await self.async_set_unique_id(controller.host)
+            self._abort_if_unique_id_configured()
+            # The other controllers found show up as discovered, one click
+            # each, instead of rescanning for every one of them.
+            for other in self._discovered.values():
+                self.hass.async_create_task(
+                    self.hass.config_entries.flow.async_init(
+                        DOMAIN,
+                        context={"source": config_entries.SOURCE_INTEGRATION_DISCOVERY},
+                        data={CONF_HOST: other.host, CONF_PORT: other.port, "zones": list(other.zones)},
+                    )
+                )
+            return self._create_entry(controller)
+
+        return self.async_show_form(
+            step_id="pick",
+            data_schema=vol.Schema({
+                vol.Required(CONF_HOST): vol.In({
+                    host: f"{host} ({len(controller.zones)} zones)"
+                    for host, controller in self._discovered.items()
+                }),
+            }),
+        )
+
+    async def async_step_integration_discovery(self, discovery_info: Dict[str, Any]):
+        controller = DiscoveredController(
+            discovery_info[CONF_HOST],
+            discovery_info.get(CONF_PORT, DEFAULT_PORT),
+            tuple(discovery_info.get("zones") or ()),
+        )
+        await self.async_set_unique_id(controller.host)
+        self._abort_if_unique_id_configured()
+        self._async_abort_entries_match({CONF_HOST: controller.host})
+        self._controller = controller
+        self.context["title_placeholders"] = {"host": controller.host}
+        return await self.async_step_confirm()
+
+    async def async_step_confirm(self, user_input=None):
+        if user_input is not None:
+            return self._create_entry(self._controller)
+        return self.async_show_form(
+            step_id="confirm",
+            description_placeholders={
+                "host": self._controller.host,
+                "zones": str(len(self._controller.zones)),
+            },
+        )
+
+    @callback
+    def _create_entry(self, controller: DiscoveredController):
+        return self.async_create_entry(title=f"Jellyfish {controller.host}", data={
+            CONF_HOST: controller.host,
+            CONF_PORT: controller.port
+        })
+
     @staticmethod
     @callback
-    def _get_schema():
-        from homeassistant.helpers import selector
-        import voluptuous as vol
+    def _get_schema(user_input: Optional[Dict[str, Any]] = None):
+        user_input = user_input or {}
         return vol.Schema({
-            CONF_HOST: vol.All(str),
-            CONF_PORT: vol.All(int)
+            vol.Required(CONF_HOST, default=user_input.get(CONF_HOST, "")): str,
+            vol.Optional(CONF_PORT, default=user_input.get(CONF_PORT, DEFAULT_PORT)): int,
         })
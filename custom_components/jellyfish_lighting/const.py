@@ -1,6 +1,8 @@
 DOMAIN = "jellyfish"
-PLATFORMS = ["light", "select"]
+PLATFORMS = ["light", "select", "sensor"]
 DEFAULT_PORT = 9000
+# The controller serves its websocket API at the root of DEFAULT_PORT.
+WS_PATH = "/"
 
 CONF_HOST = "host"
 CONF_PORT = "port"
@@ -8,3 +10,79 @@ CONF_PORT = "port"
 SERVICE_RUN_PATTERN = "run_pattern"
 SERVICE_RUN_PATTERN_ADV = "run_pattern_advanced"
 SERVICE_GET_PATTERN_DATA = "get_pattern_data"
+SERVICE_SET_ZONE_PATTERN = "set_zone_pattern"
+SERVICE_SET_GRADIENT = "set_gradient"
+SERVICE_SAVE_SCENE = "save_scene"
+SERVICE_RESTORE_SCENE = "restore_scene"
+SERVICE_DELETE_SCENE = "delete_scene"
+SERVICE_MIRROR_PATTERNS = "mirror_patterns"
+
+# Dispatcher signals, sent with the client they concern as first argument.
+SIGNAL_PATTERNS_UPDATED = f"{DOMAIN}_patterns_updated"
+SIGNAL_ZONES_UPDATED = f"{DOMAIN}_zones_updated"
+SIGNAL_ZONE_STATE_UPDATED = f"{DOMAIN}_zone_state_updated"
+
+# hass.data[DOMAIN] key of the domain-wide zone -> client registry.
+DATA_ZONE_REGISTRY = "zone_registry"
+
+# hass.data[DOMAIN] key of the domain-wide connection hub.
+DATA_HUB = "hub"
+
+# hass.data[DOMAIN] key of the domain-wide scene store.
+DATA_SCENES = "scenes"
+SCENE_STORAGE_VERSION = 1
+
+# Seconds to wait for a fromCtlr reply to a toCtlrGet request.
+DEFAULT_REQUEST_TIMEOUT = 10
+
+# Seconds to collect identical runPattern calls before sending one merged frame.
+DEFAULT_BATCH_WINDOW = 0.005
+
+# Persistent LRU cache of patternFileData payloads.
+CACHE_STORAGE_VERSION = 1
+CACHE_SAVE_DELAY = 30
+DEFAULT_CACHE_MAX_ENTRIES = 256
+DEFAULT_CACHE_MAX_BYTES = 2 * 1024 * 1024
+
+# Persisted zones/patternFileList used to create entities before connecting.
+SNAPSHOT_STORAGE_VERSION = 1
+SNAPSHOT_SAVE_DELAY = 10
+
+# Config flow: seconds to wait for a controller to answer when adding it,
+# and the per-host timeout, parallelism and size limit of a discovery scan.
+VALIDATE_TIMEOUT = 5
+DISCOVERY_TIMEOUT = 1.5
+DISCOVERY_PARALLELISM = 64
+DISCOVERY_MAX_HOSTS = 1024
+
+# Outbound command queue and reconnect backoff (seconds).
+DEFAULT_QUEUE_SIZE = 64
+# Longest a command's caller waits for its frame to be written. Frames are
+# kept queued past that, and across a reconnect, without holding the caller.
+DEFAULT_WRITE_WAIT = 2
+DEFAULT_CONNECT_TIMEOUT = 10
+RECONNECT_BACKOFF_BASE = 1
+RECONNECT_BACKOFF_MAX = 300
+# Minimum spacing of connection attempts across all controllers, so a
+# network coming back does not reconnect every controller at once.
+RECONNECT_STAGGER = 0.2
+
+# Inbound frames of at least this many characters are decoded in the executor.
+DEFAULT_DECODE_OFFLOAD_THRESHOLD = 64 * 1024
+
+# Seconds between websocket pings; an unanswered ping closes the connection.
+HEARTBEAT_INTERVAL = 30
+
+# Page size of the jellyfish/patterns websocket command.
+DEFAULT_PATTERN_PAGE_SIZE = 100
+MAX_PATTERN_PAGE_SIZE = 500
+
+# Pattern library mirror: archives under <config>/jellyfish/ and the number
+# of patternFileData requests kept in flight per controller.
+MIRROR_DIR = "jellyfish"
+MIRROR_CONCURRENCY = 8
+
+# Frames per second for zone animations and light transitions, and seconds
+# to wait for the controller to echo a frame before sending the next anyway.
+DEFAULT_ANIMATION_FPS = 20
+ANIMATION_ACK_TIMEOUT = 1
@@ -0,0 +1,23 @@
+from dataclasses import dataclass
+from typing import Any, FrozenSet, Hashable, Mapping
+
+
+@dataclass(frozen=True)
+class Delta:
+    # Keys added, removed and changed between two snapshots of a mapping.
+    added: FrozenSet[Hashable] = frozenset()
+    removed: FrozenSet[Hashable] = frozenset()
+    changed: FrozenSet[Hashable] = frozenset()
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.changed)
+
+
+def diff_mapping(old: Mapping[Hashable, Any], new: Mapping[Hashable, Any]) -> Delta:
+    old_keys = old.keys()
+    new_keys = new.keys()
+    return Delta(
+        added=frozenset(new_keys - old_keys),
+        removed=frozenset(old_keys - new_keys),
+        changed=frozenset(k for k in new_keys & old_keys if old[k] != new[k]),
+    )
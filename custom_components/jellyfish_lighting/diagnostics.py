@@ -0,0 +1,31 @@
+import time
+from typing import Any, Dict
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_HOST
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+from .websocket_api import JellyfishClient
+
+TO_REDACT = {CONF_HOST}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> Dict[str, Any]:
+    data = hass.data[DOMAIN][entry.entry_id]
+    client: JellyfishClient = data["client"]
+    cache = client.pattern_cache
+    return {
+        "entry": async_redact_data(dict(entry.data), TO_REDACT),
+        "connected": client.connected,
+        "zones": len(client.zones),
+        "patterns": len(client.catalog.names),
+        "metrics": client.metrics.as_dict(time.monotonic()),
+        "queue": client.queue_stats,
+        "decode": client.decode_stats,
+        "pattern_cache": cache.stats if cache is not None else None,
+        "animations": data["animations"].stats,
+    }
@@ -0,0 +1,122 @@
+import asyncio
+import ipaddress
+import logging
+import re
+import time
+from typing import Iterable, List, NamedTuple, Optional, Tuple
+
+from aiohttp import ClientError, ClientSession, WSMsgType
+
+from .const import (
+    DEFAULT_PORT,
+    DISCOVERY_MAX_HOSTS,
+    DISCOVERY_PARALLELISM,
+    DISCOVERY_TIMEOUT,
+    WS_PATH,
+)
+from .protocol import JellyfishProtocol, Reply
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class DiscoveredController(NamedTuple):
+    host: str
+    port: int
+    zones: Tuple[str, ...]
+
+
+def _parse_range(token: str) -> Optional[Tuple[int, int, type]]:
+    # "192.168.1.10-192.168.1.40" or "192.168.1.10-40" as (first, last,
+    # address type); None for anything else, e.g. a host name with a dash.
+    first, _, last = token.partition("-")
+    try:
+        start = ipaddress.ip_address(first)
+    except ValueError:
+        return None
+    if last.isdigit() and start.version == 4:
+        last = f"{first.rsplit('.', 1)[0]}.{last}"
+    end = ipaddress.ip_address(last)
+    if end.version != start.version or end < start:
+        raise ValueError(f"{token} is not an address range")
+    return int(start), int(end), type(start)
+
+
+def parse_hosts(text: str, max_hosts: int = DISCOVERY_MAX_HOSTS) -> List[str]:
+    # Hosts, IPs, ranges ("192.168.1.10-40") and CIDR networks
+    # ("192.168.1.0/24") separated by commas or whitespace, in order and
+    # without duplicates. Raises ValueError for a bad network or range, or
+    # more than max_hosts addresses.
+    hosts = {}
+    for token in re.split(r"[,\s]+", text.strip()):
+        if not token:
+            continue
+        span = _parse_range(token) if "-" in token else None
+        if "/" in token:
+            network = ipaddress.ip_network(token, strict=False)
+            if network.num_addresses > max_hosts + 2:
+                raise ValueError(f"{token} has more than {max_hosts} addresses")
+            hosts.update(dict.fromkeys(str(address) for address in network.hosts()))
+        elif span is not None:
+            start, end, address = span
+            if end - start >= max_hosts:
+                raise ValueError(f"{token} has more than {max_hosts} addresses")
+            hosts.update(dict.fromkeys(str(address(i)) for i in range(start, end + 1)))
+        else:
+            hosts[token] = None
+        if len(hosts) > max_hosts:
+            raise ValueError(f"more than {max_hosts} hosts")
+    return list(hosts)
+
+
+async def async_probe(
+    session: ClientSession,
+    host: str,
+    port: int = DEFAULT_PORT,
+    timeout: float = DISCOVERY_TIMEOUT,
+) -> Optional[DiscoveredController]:
+    # Connect, ask for the zones and wait for the reply. None when the host
+    # does not answer like a Jellyfish controller within timeout.
+    try:
+        zones = await asyncio.wait_for(_async_get_zones(session, host, port), timeout)
+    except (asyncio.TimeoutError, ClientError, OSError, ValueError) as exc:
+        _LOGGER.debug("No Jellyfish controller at %s:%s: %s", host, port, exc)
+        return None
+    if zones is None:
+        return None
+    return DiscoveredController(host, port, zones)
+
+
+async def _async_get_zones(
+    session: ClientSession, host: str, port: int
+) -> Optional[Tuple[str, ...]]:
+    protocol = JellyfishProtocol(host)
+    async with session.ws_connect(f"ws://{host}:{port}{WS_PATH}") as ws:
+        # Only the zones; the pattern list can be large.
+        frame, _ = protocol.get_frame(["zones"])
+        await ws.send_str(frame)
+        async for msg in ws:
+            if msg.type != WSMsgType.TEXT:
+                continue
+            for event in protocol.receive(msg.data, time.monotonic()):
+                if isinstance(event, Reply) and event.key == ("zones",):
+                    return tuple(protocol.zones)
+    return None
+
+
+async def async_discover(
+    session: ClientSession,
+    hosts: Iterable[str],
+    port: int = DEFAULT_PORT,
+    timeout: float = DISCOVERY_TIMEOUT,
+    parallelism: int = DISCOVERY_PARALLELISM,
+) -> List[DiscoveredController]:
+    # Probe every host concurrently, at most `parallelism` at a time, so a
+    # /24 takes about 254 / parallelism timeouts rather than 254.
+    semaphore = asyncio.Semaphore(parallelism)
+
+    async def probe(host: str) -> Optional[DiscoveredController]:
+        async with semaphore:
+            return await async_probe(session, host, port, timeout)
+
+    results = await asyncio.gather(*(probe(host) for host in hosts))
+    return [result for result in results if result is not None]
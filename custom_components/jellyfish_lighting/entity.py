@@ -0,0 +1,18 @@
+from homeassistant.helpers.entity import DeviceInfo, Entity
+
+from .const import DOMAIN
+from .websocket_api import JellyfishClient
+
+
+class JellyfishEntity(Entity):
+    # Base for every entity of one controller: they all belong to that
+    # config entry's device and are named relative to it.
+    _attr_has_entity_name = True
+
+    def __init__(self, client: JellyfishClient, entry_id: str):
+        self._client = client
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, entry_id)},
+            manufacturer="JellyFish Lighting",
+            name=f"Jellyfish {client.host}",
+        )
@@ -0,0 +1,139 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+
+from .const import DOMAIN, RECONNECT_STAGGER
+from .registry import ZoneRegistry
+from .websocket_api import JellyfishClient
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class JellyfishHub:
+    # Domain-wide owner of every controller connection. Clients share HA's
+    # pooled HTTP session, connection attempts are spaced across controllers,
+    # connect tasks are tracked so unloading cancels them, and commands fan
+    # out to many controllers at once.
+
+    def __init__(self, hass: HomeAssistant, registry: ZoneRegistry, stagger: float = RECONNECT_STAGGER):
+        self.hass = hass
+        self.registry = registry
+        self.stagger = stagger
+        # Keyed by config entry id.
+        self._clients: Dict[str, JellyfishClient] = {}
+        self._connect_tasks: Dict[str, asyncio.Task] = {}
+        self._next_slot = 0.0
+
+    @property
+    def clients(self) -> List[JellyfishClient]:
+        return list(self._clients.values())
+
+    def get(self, entry_id: str) -> Optional[JellyfishClient]:
+        return self._clients.get(entry_id)
+
+    @callback
+    def async_create_client(self, entry_id: str, host: str, port: int, **kwargs) -> JellyfishClient:
+        client = JellyfishClient(
+            self.hass,
+            host,
+            port,
+            session=async_get_clientsession(self.hass),
+            connect_gate=self._async_connect_slot,
+            **kwargs,
+        )
+        self._clients[entry_id] = client
+        return client
+
+    @callback
+    def async_start(self, entry_id: str):
+        # Connect in the background so an offline controller cannot stall
+        # setup; the client keeps retrying on its own.
+        client = self._clients[entry_id]
+        self._connect_tasks[entry_id] = self.hass.async_create_background_task(
+            client.connect(), f"{DOMAIN}_connect_{entry_id}"
+        )
+
+    async def async_remove(self, entry_id: str):
+        task = self._connect_tasks.pop(entry_id, None)
+        if task is not None:
+            task.cancel()
+        client = self._clients.pop(entry_id, None)
+        if client is None:
+            return
+        self.registry.async_remove_client(client)
+        # Cancels the client's read, writer, heartbeat and reconnect tasks.
+        await client.disconnect()
+
+    async def async_shutdown(self):
+        await asyncio.gather(*(self.async_remove(entry_id) for entry_id in list(self._clients)))
+
+    async def _async_connect_slot(self):
+        # Hand out connection attempts at least `stagger` apart across all
+        # controllers; the backoff jitter alone still lets a burst of
+        # controllers whose timers expire together hit the network at once.
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        slot = max(now, self._next_slot)
+        self._next_slot = slot + self.stagger
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+    async def async_for_clients(
+        self,
+        clients: Iterable[JellyfishClient],
+        send: Callable[[JellyfishClient], Awaitable[Any]],
+    ) -> Dict[JellyfishClient, Any]:
+        # Run send for every controller at once. A failing controller does not
+        # stop the others; its exception is returned in place of a result.
+        clients = list(clients)
+        results = await asyncio.gather(*(send(client) for client in clients), return_exceptions=True)
+        for client, result in zip(clients, results):
+            if isinstance(result, Exception):
+                _LOGGER.warning("Command to %s failed: %s", client.host, result)
+        return dict(zip(clients, results))
+
+    async def async_fan_out(
+        self,
+        zones: List[str],
+        send: Callable[[JellyfishClient, List[str]], Awaitable[Any]],
+    ) -> Dict[JellyfishClient, List[str]]:
+        # Split the zones per controller and send to every controller at once,
+        # so a whole-property command costs one round trip per controller.
+        # Raises the first controller's failure once all have finished.
+        # Callers pass every zone explicitly; no zones sends nothing.
+        groups, missing = self.registry.group_by_client(zones)
+        if missing:
+            clients = self.clients
+            if len(clients) == 1:
+                # Zones not reported yet; let the only controller decide.
+                groups.setdefault(clients[0], []).extend(missing)
+            else:
+                _LOGGER.warning("Zones %s not found on any controller", missing)
+        results = await self.async_for_clients(groups, lambda client: send(client, groups[client]))
+        for result in results.values():
+            if isinstance(result, Exception):
+                raise result
+        return groups
+
+    async def async_run_pattern(
+        self, file: str, zones: List[str], state: int = 1, force: bool = False
+    ) -> Dict[JellyfishClient, List[str]]:
+        return await self.async_fan_out(
+            zones,
+            lambda client, names: client.run_pattern(
+                file=file, zone_names=names, state=state, force=force
+            ),
+        )
+
+    async def async_run_pattern_advanced(
+        self, data: Any, zones: List[str], state: int = 1, force: bool = False
+    ) -> Dict[JellyfishClient, List[str]]:
+        return await self.async_fan_out(
+            zones,
+            lambda client, names: client.run_pattern_advanced(
+                data=data, zone_names=names, state=state, force=force
+            ),
+        )
@@ -1,48 +1,131 @@
+import asyncio
 import logging
-from typing import Any
+from typing import Any, Dict, FrozenSet, Optional
 
-from homeassistant.components.light import LightEntity, ColorMode
+from homeassistant.components.light import (
+    ATTR_BRIGHTNESS,
+    ATTR_RGB_COLOR,
+    ATTR_TRANSITION,
+    ColorMode,
+    LightEntity,
+    LightEntityFeature,
+)
 from homeassistant.core import HomeAssistant, callback
-from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.helpers.dispatcher import async_dispatcher_connect
 
-from .const import DOMAIN
+from . import pattern as pattern_model, pixels
+from .animation import AnimationScheduler, fade
+from .const import (
+    DOMAIN,
+    SIGNAL_ZONE_STATE_UPDATED,
+    SIGNAL_ZONES_UPDATED,
+)
+from .delta import Delta
+from .entity import JellyfishEntity
+from .models import ZoneState
+from .pattern import InvalidPattern, Pattern
 from .websocket_api import JellyfishClient
 
 _LOGGER = logging.getLogger(__name__)
 
 async def async_setup_entry(hass: HomeAssistant, entry, async_add_entities):
     client: JellyfishClient = hass.data[DOMAIN][entry.entry_id]["client"]
+    animations: AnimationScheduler = hass.data[DOMAIN][entry.entry_id]["animations"]
     entities = {}
     added_zones = set()
 
-    async def add_zone_entities():
+    @callback
+    def add_zone_entities():
         new_entities = []
         for zone_name in client.zones.keys():
             if zone_name not in added_zones:
-                entity = JellyfishZoneLight(client, zone_name)
+                entity = JellyfishZoneLight(client, entry.entry_id, zone_name, animations)
                 entities[zone_name] = entity
                 new_entities.append(entity)
                 added_zones.add(zone_name)
         if new_entities:
             async_add_entities(new_entities, True)
 
-    # Subscribe to zone updates with async callback
-    async_dispatcher_connect(hass, f"{DOMAIN}_zones_updated", add_zone_entities)
-    # Initial request
-    await client.request_zones()
-    await add_zone_entities()
+    # Subscribe to zone updates for this controller only
+    @callback
+    def async_zones_updated(updated: JellyfishClient, delta: Delta):
+        if updated is not client:
+            return
+        add_zone_entities()
+        # Zones that disappear keep their entity but go unavailable.
+        for zone_name in delta.removed | delta.added:
+            if zone_name in entities:
+                entities[zone_name].async_set_zone_available(zone_name in client.zones)
 
-class JellyfishZoneLight(LightEntity):
-    _attr_supported_color_modes = {ColorMode.ONOFF}
-    _attr_color_mode = ColorMode.ONOFF
+    entry.async_on_unload(
+        async_dispatcher_connect(hass, SIGNAL_ZONES_UPDATED, async_zones_updated)
+    )
+    # Zones restored from the snapshot; the client requests fresh ones on connect.
+    add_zone_entities()
 
-    def __init__(self, client: JellyfishClient, zone_name: str):
-        self._client = client
+class JellyfishZoneLight(JellyfishEntity, LightEntity):
+    # HA converts HS input to RGB for lights that only declare RGB.
+    _attr_supported_color_modes = {ColorMode.RGB}
+    _attr_color_mode = ColorMode.RGB
+    _attr_supported_features = LightEntityFeature.TRANSITION
+    # State is pushed by the controller through the client's zone state model.
+    _attr_should_poll = False
+
+    def __init__(
+        self,
+        client: JellyfishClient,
+        entry_id: str,
+        zone_name: str,
+        animations: AnimationScheduler,
+    ):
+        super().__init__(client, entry_id)
+        self._animations = animations
         self._zone_name = zone_name
-        self._attr_name = f"Jellyfish {zone_name}"
+        self._attr_name = zone_name
         self._is_on = False
         self._pattern = None
+        # Last state the zone was on with, replayed by a plain turn_on.
+        self._last_on: Optional[ZoneState] = None
+        self._apply_zone_state()
+
+    async def async_added_to_hass(self):
+        self.async_on_remove(
+            async_dispatcher_connect(
+                self.hass, SIGNAL_ZONE_STATE_UPDATED, self._async_zone_state_updated
+            )
+        )
+
+    def _apply_zone_state(self):
+        zone_state = self._client.zone_states.get(self._zone_name)
+        if zone_state is None:
+            return
+        self._is_on = zone_state.is_on
+        if zone_state.is_on:
+            self._last_on = zone_state
+            if zone_state.file:
+                # Saved pattern: its colors are not known without a fetch.
+                self._attr_brightness = 255
+                self._attr_rgb_color = None
+            elif zone_state.data:
+                # Data patterns carry their colors and brightness.
+                try:
+                    running = pattern_model.from_json(zone_state.data)
+                except InvalidPattern:
+                    running = None
+                if running is not None:
+                    self._attr_brightness = pixels.from_percent(running.run_data.brightness)
+                    self._attr_rgb_color = tuple(running.colors[:3])
+        if zone_state.file:
+            self._pattern = zone_state.pattern_name
+
+    @callback
+    def _async_zone_state_updated(self, updated: JellyfishClient, zones: FrozenSet[str]):
+        if updated is self._client and self._zone_name in zones:
+            if self._animations.is_animating(self._zone_name):
+                # Intermediate transition frames; the final command updates us.
+                return
+            self._apply_zone_state()
+            self.async_write_ha_state()
 
     @property
     def unique_id(self):
@@ -54,40 +137,93 @@ class JellyfishZoneLight(LightEntity):
 
     @property
     def extra_state_attributes(self):
-        # Expose available patterns and current pattern
-        patterns = self._client.patterns
-        folders = {}
-        for pat in patterns:
-            folder = pat.get("folders", "Unknown")
-            name = pat.get("name", "Unknown")
-            folders.setdefault(folder, []).append(name)
-        return {
-            "available_folders": list(folders.keys()),
-            "available_patterns": folders,
-            "current_pattern": self._pattern,
-        }
-
-    @property
-    def device_info(self) -> DeviceInfo:
-        return DeviceInfo(
-            identifiers={(DOMAIN, "controller")},
-            name="Jellyfish Controller"
-        )
+        # The pattern catalog is served once per controller by its patterns
+        # sensor and the jellyfish/patterns websocket command, not per zone.
+        return {"current_pattern": self._pattern}
 
+    # No optimistic state below: the zone state model is updated once the
+    # frame is written and again when the controller reports the change.
     async def async_turn_on(self, **kwargs: Any):
-        # Use last selected pattern or default
-        pattern = self._pattern or ""
+        target = await self._target_pattern(kwargs)
+        if target is not None:
+            if kwargs.get(ATTR_TRANSITION):
+                start = pixels.to_percent(self._attr_brightness or 0) if self._is_on else 0
+                if not await self._animations.animate(
+                    [self._zone_name],
+                    fade(target, start, target.run_data.brightness),
+                    kwargs[ATTR_TRANSITION],
+                ):
+                    # Interrupted by a newer command, or the link went down.
+                    return
+            await self._client.run_pattern_advanced(
+                data=target, zone_names=[self._zone_name], state=1
+            )
+            return
+        # Use last pattern the zone ran, or default
+        last = self._last_on
+        if kwargs.get(ATTR_TRANSITION) and not self._is_on:
+            target = await self._pattern_of(last)
+            if target is not None and not await self._animations.animate(
+                [self._zone_name],
+                fade(target, 0, target.run_data.brightness),
+                kwargs[ATTR_TRANSITION],
+            ):
+                return
+        if last is not None and last.data and not last.file:
+            await self._client.run_pattern_advanced(
+                data=last.data, zone_names=[self._zone_name], state=1
+            )
+            return
+        pattern = last.file if last is not None else ""
         await self._client.run_pattern(file=pattern, zone_names=[self._zone_name], state=1)
-        self._is_on = True
-        self.async_write_ha_state()
 
     async def async_turn_off(self, **kwargs: Any):
+        if kwargs.get(ATTR_TRANSITION) and self._is_on:
+            current = await self._pattern_of(self._client.zone_states.get(self._zone_name))
+            if current is not None and not await self._animations.animate(
+                [self._zone_name],
+                fade(current, current.run_data.brightness, 0),
+                kwargs[ATTR_TRANSITION],
+            ):
+                return
         await self._client.run_pattern(file="", zone_names=[self._zone_name], state=0)
-        self._is_on = False
-        self.async_write_ha_state()
 
-    async def async_set_pattern(self, pattern: str):
-        self._pattern = pattern
-        await self._client.run_pattern(file=pattern, zone_names=[self._zone_name], state=1)
-        self._is_on = True
-        self.async_write_ha_state()
+    async def _target_pattern(self, kwargs: Dict[str, Any]) -> Optional[Pattern]:
+        # Pattern for a color and/or brightness change; None for a plain on.
+        rgb = kwargs.get(ATTR_RGB_COLOR)
+        brightness = kwargs.get(ATTR_BRIGHTNESS)
+        if rgb is None and brightness is None:
+            return None
+        if brightness is None:
+            brightness = self._attr_brightness or 255
+        percent = pixels.to_percent(brightness)
+        if rgb is not None:
+            return pixels.color_pattern(rgb, percent)
+        base = await self._pattern_of(self._last_on)
+        if base is None:
+            return pixels.color_pattern((255, 255, 255), percent)
+        return base.replace(run_data=base.run_data._replace(brightness=percent))
+
+    async def _pattern_of(self, zone_state: Optional[ZoneState]) -> Optional[Pattern]:
+        # The pattern behind a zone state, to animate or re-dim; None if unknown.
+        if zone_state is None:
+            return None
+        try:
+            if zone_state.file:
+                folder, _, name = zone_state.file.rpartition("/")
+                return pattern_model.from_pattern_file_data(
+                    await self._client.get_pattern_file_data(folder, name)
+                )
+            if zone_state.data:
+                return pattern_model.from_json(zone_state.data)
+        except (asyncio.TimeoutError, ConnectionError, InvalidPattern) as exc:
+            _LOGGER.debug("Pattern of %s unavailable: %s", self._zone_name, exc)
+        return None
+
+    @callback
+    def async_set_zone_available(self, available: bool):
+        if self._attr_available != available:
+            self._attr_available = available
+            if self.hass is not None:
+                self.async_write_ha_state()
+
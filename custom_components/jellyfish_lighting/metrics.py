@@ -0,0 +1,124 @@
+import bisect
+from typing import Any, Dict, Optional, Tuple
+
+# Histogram bucket upper bounds in seconds; the last bucket is open ended.
+LATENCY_BUCKETS: Tuple[float, ...] = (
+    0.001, 0.002, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+)
+
+
+class Histogram:
+    # Fixed buckets so recording is a bisect and two integer adds.
+    __slots__ = ("bounds", "buckets", "count", "total", "max")
+
+    def __init__(self, bounds: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.bounds = bounds
+        self.buckets = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        self.buckets[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    @property
+    def mean(self) -> Optional[float]:
+        return self.total / self.count if self.count else None
+
+    def quantile(self, q: float) -> Optional[float]:
+        # Upper bound of the bucket holding the q-th observation.
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.bounds, self.buckets):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def as_dict(self) -> Dict[str, Any]:
+        def ms(value):
+            return None if value is None else round(value * 1000, 3)
+
+        labels = [f"le_{ms(bound):g}ms" for bound in self.bounds] + ["inf"]
+        return {
+            "count": self.count,
+            "mean_ms": ms(self.mean),
+            "p50_ms": ms(self.quantile(0.5)),
+            "p95_ms": ms(self.quantile(0.95)),
+            "max_ms": ms(self.max),
+            "buckets": dict(zip(labels, self.buckets)),
+        }
+
+
+class ClientMetrics:
+    # Counters updated inline by JellyfishProtocol. Everything here is plain
+    # attribute arithmetic; formatting happens only when read. Like the
+    # protocol, it never reads the clock: callers pass monotonic `now`.
+    def __init__(self):
+        self.frames_in = 0
+        self.frames_out = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.connects = 0
+        self.reconnects = 0
+        self.downtime = 0.0
+        self._down_since: Optional[float] = None
+        self.heartbeat_rtt: Optional[float] = None
+        self.heartbeat = Histogram()
+        self.outbound_wait = Histogram()
+        # Send-to-ack latency per command type, e.g. "runPattern" (write to
+        # controller echo) or "patternFileData" (get to reply).
+        self.latency: Dict[str, Histogram] = {}
+
+    def observe_latency(self, command: str, seconds: float):
+        histogram = self.latency.get(command)
+        if histogram is None:
+            histogram = self.latency[command] = Histogram()
+        histogram.observe(seconds)
+
+    def observe_heartbeat(self, seconds: float):
+        self.heartbeat_rtt = seconds
+        self.heartbeat.observe(seconds)
+
+    def mark_up(self, now: float):
+        if self._down_since is not None:
+            self.downtime += now - self._down_since
+            self._down_since = None
+            self.reconnects += 1
+        self.connects += 1
+
+    def mark_down(self, now: float):
+        if self._down_since is None:
+            self._down_since = now
+
+    def current_downtime(self, now: float) -> float:
+        if self._down_since is None:
+            return 0.0
+        return now - self._down_since
+
+    def total_downtime(self, now: float) -> float:
+        return self.downtime + self.current_downtime(now)
+
+    def as_dict(self, now: float) -> Dict[str, Any]:
+        return {
+            "frames_in": self.frames_in,
+            "frames_out": self.frames_out,
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "connects": self.connects,
+            "reconnects": self.reconnects,
+            "downtime_s": round(self.total_downtime(now), 3),
+            "current_downtime_s": round(self.current_downtime(now), 3),
+            "heartbeat_rtt_ms": (
+                None if self.heartbeat_rtt is None else round(self.heartbeat_rtt * 1000, 3)
+            ),
+            "heartbeat": self.heartbeat.as_dict(),
+            "outbound_wait": self.outbound_wait.as_dict(),
+            "latency": {command: h.as_dict() for command, h in self.latency.items()},
+        }
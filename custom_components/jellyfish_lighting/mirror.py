@@ -0,0 +1,154 @@
+import asyncio
+import json
+import logging
+import os
+import time
+import zipfile
+from typing import Any, Dict, List, Optional
+
+from homeassistant.core import HomeAssistant
+from homeassistant.util import slugify
+
+from . import codec
+from .const import MIRROR_CONCURRENCY, MIRROR_DIR
+from .websocket_api import JellyfishClient
+
+_LOGGER = logging.getLogger(__name__)
+
+INDEX_MEMBER = "index.json"
+MEMBER_PREFIX = "patterns/"
+
+
+def _member(key: str) -> str:
+    # "folder/name" -> "patterns/folder/name.json"
+    return f"{MEMBER_PREFIX}{key}.json"
+
+
+def _read_index(path: str) -> Dict[str, str]:
+    # "folder/name" -> catalog signature the member was fetched under.
+    try:
+        with zipfile.ZipFile(path) as archive:
+            return json.loads(archive.read(INDEX_MEMBER))["files"]
+    except FileNotFoundError:
+        return {}
+    except (zipfile.BadZipFile, KeyError, ValueError) as exc:
+        _LOGGER.warning("Pattern archive %s unreadable, rebuilding: %s", path, exc)
+        return {}
+
+
+def _write_archive(
+    path: str, host: str, index: Dict[str, str], fetched: Dict[str, Dict[str, Any]]
+):
+    # Unchanged members are copied from the previous archive; nothing is
+    # fetched again. Written to a temporary file and swapped in, so a reader
+    # never sees a half-written archive.
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.tmp"
+    with zipfile.ZipFile(tmp, "w", zipfile.ZIP_DEFLATED) as out:
+        keep = {_member(key) for key in index if key not in fetched}
+        if keep and os.path.exists(path):
+            with zipfile.ZipFile(path) as old:
+                for info in old.infolist():
+                    if info.filename in keep:
+                        out.writestr(info, old.read(info))
+        for key, data in fetched.items():
+            out.writestr(_member(key), codec.dumps(data))
+        out.writestr(
+            INDEX_MEMBER,
+            json.dumps({"host": host, "updated": time.time(), "files": index}, sort_keys=True),
+        )
+    os.replace(tmp, path)
+
+
+def read_pattern(path: str, folder: str, name: str) -> Optional[Dict[str, Any]]:
+    # Only the one member is decompressed; the zip directory is the index.
+    try:
+        with zipfile.ZipFile(path) as archive:
+            return codec.loads(archive.read(_member(f"{folder}/{name}")))
+    except (FileNotFoundError, KeyError, zipfile.BadZipFile):
+        return None
+
+
+class PatternMirror:
+    # Local zip copy of one controller's pattern library. Each pattern file
+    # is its own deflated member, and index.json records the catalog
+    # signature each was fetched under, so later runs fetch only new or
+    # changed files and drop removed ones.
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        client: JellyfishClient,
+        concurrency: int = MIRROR_CONCURRENCY,
+    ):
+        self.hass = hass
+        self.client = client
+        self.concurrency = concurrency
+        self.path = hass.config.path(MIRROR_DIR, f"patterns_{slugify(client.host)}.zip")
+        self._lock = asyncio.Lock()
+
+    async def async_read(self, folder: str, name: str) -> Optional[Dict[str, Any]]:
+        return await self.hass.async_add_executor_job(read_pattern, self.path, folder, name)
+
+    async def async_mirror(self, refresh: bool = False) -> Dict[str, Any]:
+        async with self._lock:
+            return await self._async_mirror(refresh)
+
+    async def _async_mirror(self, refresh: bool) -> Dict[str, Any]:
+        client = self.client
+        start = time.monotonic()
+        previous = await self.hass.async_add_executor_job(_read_index, self.path)
+        wanted = {
+            f"{folder}/{name}": (folder, name, signature)
+            for (folder, name), signature in client.catalog.signatures.items()
+        }
+        # Signatures come from the listing, which does not change when a
+        # file's content is edited; refresh fetches every file again.
+        stale = [
+            (key, folder, name)
+            for key, (folder, name, signature) in wanted.items()
+            if refresh or previous.get(key) != signature
+        ]
+        fetched: Dict[str, Dict[str, Any]] = {}
+        failed: List[str] = []
+        # Requests share the client's websocket; the semaphore keeps a few in
+        # flight so they are pipelined without flooding the controller.
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def fetch(key: str, folder: str, name: str):
+            async with semaphore:
+                try:
+                    # Straight from the controller: the cached copy may be
+                    # stale, and a bulk copy should not touch the LRU.
+                    fetched[key] = await client.get_pattern_file_data(
+                        folder, name, cache_result=False, refresh=True
+                    )
+                except (asyncio.TimeoutError, ConnectionError) as exc:
+                    _LOGGER.debug("Could not mirror %s from %s: %s", key, client.host, exc)
+                    failed.append(key)
+
+        await asyncio.gather(*(fetch(*item) for item in stale))
+        # A file that failed keeps its previous copy, under its old signature
+        # so the next run tries it again.
+        index = {
+            key: wanted[key][2] if key in fetched else previous[key]
+            for key in wanted
+            if key in fetched or key in previous
+        }
+        removed = previous.keys() - wanted.keys()
+        if fetched or removed or not os.path.exists(self.path):
+            await self.hass.async_add_executor_job(
+                _write_archive, self.path, client.host, index, fetched
+            )
+        if failed:
+            _LOGGER.warning(
+                "Mirrored %s with %d of %d files failing", client.host, len(failed), len(stale)
+            )
+        return {
+            "path": self.path,
+            "files": len(index),
+            "fetched": len(fetched),
+            "removed": len(removed),
+            "failed": sorted(failed),
+            "seconds": round(time.monotonic() - start, 2),
+        }
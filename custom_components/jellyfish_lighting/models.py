@@ -0,0 +1,23 @@
+from typing import Any, Dict, NamedTuple, Optional
+
+
+class ZoneState(NamedTuple):
+    # What a zone is running, as reported by (or last written to) the controller.
+    file: str = ""
+    data: str = ""
+    state: int = 0
+
+    @classmethod
+    def from_run_pattern(cls, run: Dict[str, Any]) -> "ZoneState":
+        return cls(run.get("file") or "", run.get("data") or "", int(run.get("state") or 0))
+
+    @property
+    def is_on(self) -> bool:
+        return bool(self.state)
+
+    @property
+    def pattern_name(self) -> Optional[str]:
+        # "folder/name" -> "name"; None for raw data patterns.
+        if not self.file:
+            return None
+        return self.file.rsplit("/", 1)[-1]
@@ -0,0 +1,229 @@
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Mapping, NamedTuple, Optional, Tuple, Union
+
+from . import codec
+
+# Parsed patterns kept per distinct JSON text / field set, so replaying or
+# re-parameterizing a known effect is a cache lookup.
+PATTERN_CACHE_SIZE = 256
+
+
+class InvalidPattern(ValueError):
+    pass
+
+
+class RunData(NamedTuple):
+    speed: int = 10
+    brightness: int = 100
+    effect: str = "No Effect"
+    effect_value: int = 0
+    rgb_adj: Tuple[int, int, int] = (100, 100, 100)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "speed": self.speed,
+            "brightness": self.brightness,
+            "effect": self.effect,
+            "effectValue": self.effect_value,
+            "rgbAdj": list(self.rgb_adj),
+        }
+
+
+# jsonData keys this model understands, in the order they are written.
+_FIELDS = (
+    "colors",
+    "spaceBetweenPixels",
+    "effectBetweenPixels",
+    "type",
+    "skip",
+    "numOfLeds",
+    "runData",
+    "direction",
+)
+
+
+class Pattern:
+    # Immutable pattern description. Equality and hashing go through the
+    # serialized form, which is built once and reused for every send.
+    __slots__ = (
+        "colors",
+        "type",
+        "space_between_pixels",
+        "effect_between_pixels",
+        "skip",
+        "num_of_leds",
+        "run_data",
+        "direction",
+        "extra",
+        "_json",
+    )
+
+    def __init__(
+        self,
+        colors: Union[Iterable[int], bytes],
+        type: str = "Color",
+        space_between_pixels: int = 0,
+        effect_between_pixels: str = "No Color Transform",
+        skip: int = 0,
+        num_of_leds: int = 1,
+        run_data: RunData = RunData(),
+        direction: str = "Left",
+        extra: Optional[Mapping[str, Any]] = None,
+    ):
+        set_ = object.__setattr__
+        # Byte buffers (from pixels.py) are kept as is: already immutable,
+        # in range and cheap to hash.
+        if isinstance(colors, (bytes, bytearray)):
+            colors = bytes(colors)
+        else:
+            colors = tuple(colors)
+        set_(self, "colors", colors)
+        set_(self, "type", type)
+        set_(self, "space_between_pixels", space_between_pixels)
+        set_(self, "effect_between_pixels", effect_between_pixels)
+        set_(self, "skip", skip)
+        set_(self, "num_of_leds", num_of_leds)
+        set_(self, "run_data", run_data)
+        set_(self, "direction", direction)
+        # Keys the controller sent that this model does not know; kept so a
+        # loaded pattern is written back unchanged.
+        set_(self, "extra", tuple(sorted((extra or {}).items())))
+        self._validate()
+        set_(self, "_json", codec.dumps(self.as_dict()))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Pattern is immutable")
+
+    def __eq__(self, other):
+        if not isinstance(other, Pattern):
+            return NotImplemented
+        return self._json == other._json
+
+    def __hash__(self):
+        return hash(self._json)
+
+    def __repr__(self):
+        return f"Pattern({self._json})"
+
+    @property
+    def json(self) -> str:
+        return self._json
+
+    def as_dict(self) -> Dict[str, Any]:
+        data = {
+            "colors": list(self.colors),
+            "spaceBetweenPixels": self.space_between_pixels,
+            "effectBetweenPixels": self.effect_between_pixels,
+            "type": self.type,
+            "skip": self.skip,
+            "numOfLeds": self.num_of_leds,
+            "runData": self.run_data.as_dict(),
+            "direction": self.direction,
+        }
+        data.update(self.extra)
+        return data
+
+    def replace(self, **changes) -> "Pattern":
+        fields = {name: getattr(self, name) for name in self.__slots__[:-2]}
+        fields["extra"] = dict(self.extra)
+        fields.update(changes)
+        return make(**fields)
+
+    def _validate(self):
+        # `type(...) is int` rather than isinstance: JSON true/false would
+        # otherwise pass as 1/0 and be written back as booleans.
+        colors = self.colors
+        if not colors or len(colors) % 3:
+            raise InvalidPattern("colors must be a non-empty list of RGB triplets")
+        if not isinstance(colors, bytes) and not all(
+            type(c) is int and 0 <= c <= 255 for c in colors
+        ):
+            raise InvalidPattern("color values must be integers from 0 to 255")
+        for name in ("type", "effect_between_pixels", "direction"):
+            if not isinstance(getattr(self, name), str) or not getattr(self, name):
+                raise InvalidPattern(f"{name} must be a non-empty string")
+        for name in ("space_between_pixels", "skip", "num_of_leds"):
+            if type(getattr(self, name)) is not int or getattr(self, name) < 0:
+                raise InvalidPattern(f"{name} must be a non-negative integer")
+        run = self.run_data
+        if not isinstance(run, RunData):
+            raise InvalidPattern("run_data must be a RunData")
+        if type(run.speed) is not int or run.speed < 0:
+            raise InvalidPattern("speed must be a non-negative integer")
+        if type(run.brightness) is not int or not 0 <= run.brightness <= 100:
+            raise InvalidPattern("brightness must be an integer from 0 to 100")
+        if not isinstance(run.effect, str) or type(run.effect_value) is not int:
+            raise InvalidPattern("effect must be a string and effectValue an integer")
+        if len(run.rgb_adj) != 3 or not all(type(v) is int and v >= 0 for v in run.rgb_adj):
+            raise InvalidPattern("rgbAdj must be three non-negative integers")
+
+
+@lru_cache(maxsize=PATTERN_CACHE_SIZE)
+def _make(fields: Tuple[Tuple[str, Any], ...], extra: Tuple[Tuple[str, Any], ...]) -> Pattern:
+    return Pattern(**dict(fields), extra=dict(extra))
+
+
+def make(extra: Optional[Mapping[str, Any]] = None, **fields) -> Pattern:
+    # Cached constructor; falls back to a fresh instance for unhashable input.
+    if "colors" in fields and not isinstance(fields["colors"], bytes):
+        fields["colors"] = tuple(fields["colors"])
+    try:
+        return _make(tuple(sorted(fields.items())), tuple(sorted((extra or {}).items())))
+    except TypeError:
+        return Pattern(extra=extra, **fields)
+
+
+def from_dict(data: Mapping[str, Any]) -> Pattern:
+    if not isinstance(data, Mapping):
+        raise InvalidPattern("pattern data must be a JSON object")
+    run = data.get("runData")
+    if run is None:
+        run = {}
+    if not isinstance(run, Mapping):
+        raise InvalidPattern("runData must be a JSON object")
+    try:
+        run_data = RunData(
+            speed=run.get("speed", 10),
+            brightness=run.get("brightness", 100),
+            effect=run.get("effect", "No Effect"),
+            effect_value=run.get("effectValue", 0),
+            rgb_adj=tuple(run.get("rgbAdj") or (100, 100, 100)),
+        )
+        return Pattern(
+            colors=data.get("colors") or (),
+            type=data.get("type", "Color"),
+            space_between_pixels=data.get("spaceBetweenPixels", 0),
+            effect_between_pixels=data.get("effectBetweenPixels", "No Color Transform"),
+            skip=data.get("skip", 0),
+            num_of_leds=data.get("numOfLeds", 1),
+            run_data=run_data,
+            direction=data.get("direction", "Left"),
+            extra={k: v for k, v in data.items() if k not in _FIELDS},
+        )
+    except TypeError as exc:
+        raise InvalidPattern(str(exc)) from exc
+
+
+@lru_cache(maxsize=PATTERN_CACHE_SIZE)
+def from_json(text: str) -> Pattern:
+    try:
+        data = codec.loads(text)
+    except ValueError as exc:
+        raise InvalidPattern(f"pattern data is not valid JSON: {exc}") from exc
+    return from_dict(data)
+
+
+def from_pattern_file_data(data: Mapping[str, Any]) -> Pattern:
+    # Reply of a patternFileData get: {"folders", "name", "jsonData": "<json>"}.
+    json_data = data.get("jsonData")
+    if not isinstance(json_data, str):
+        raise InvalidPattern("patternFileData has no jsonData")
+    return from_json(json_data)
+
+
+def coerce(value: Union[Pattern, str, Mapping[str, Any]]) -> Pattern:
+    if isinstance(value, Pattern):
+        return value
+    if isinstance(value, str):
+        return from_json(value)
+    return from_dict(value)
@@ -0,0 +1,121 @@
+from functools import lru_cache
+from itertools import accumulate, repeat
+from operator import floordiv
+from typing import Any, Dict, Iterable, Optional, Sequence, Tuple
+
+from .pattern import Pattern, RunData, make
+
+# NumPy is optional; without it the same math runs through range/map, which
+# keeps the per-pixel work in C either way.
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+RGB = Tuple[int, int, int]
+
+# Pixel buffers are immutable bytes (R, G, B per pixel) cached by their
+# inputs, so repeating a command reuses the buffer and its pattern.
+BUFFER_CACHE_SIZE = 64
+
+
+def pixel_count(zone_info: Optional[Dict[str, Any]]) -> int:
+    # From the controller's zones payload: {"numPixels": 150, "portMap": [...]}.
+    try:
+        return max(int((zone_info or {}).get("numPixels") or 0), 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+@lru_cache(maxsize=BUFFER_CACHE_SIZE)
+def solid(rgb: RGB, count: int) -> bytes:
+    return bytes(rgb) * count
+
+
+@lru_cache(maxsize=BUFFER_CACHE_SIZE)
+def gradient(stops: Tuple[RGB, ...], count: int) -> bytes:
+    # Evenly spaced color stops interpolated linearly over count pixels.
+    if count <= 0 or not stops:
+        return b""
+    if len(stops) == 1 or count == 1:
+        return solid(stops[0], count)
+    if np is not None:
+        return _gradient_numpy(stops, count)
+    return _gradient_array(stops, count)
+
+
+def _gradient_numpy(stops: Tuple[RGB, ...], count: int) -> bytes:
+    # The integer math of _gradient_array, vectorized, so both paths round
+    # halves the same way (np.rint would round them to even).
+    colors = np.asarray(stops, dtype=np.int64)
+    k = len(stops) - 1
+    m = count - 1
+    scaled = np.arange(count, dtype=np.int64) * k
+    segment = np.minimum(scaled // m, k - 1)
+    offset = (scaled - segment * m)[:, None]
+    start = colors[segment]
+    delta = colors[segment + 1] - start
+    pixels = (2 * (start * m + delta * offset) + m) // (2 * m)
+    return pixels.astype(np.uint8).tobytes()
+
+
+def _gradient_array(stops: Tuple[RGB, ...], count: int) -> bytes:
+    # Pixel j sits at j * k / m between stops. Within one pair of stops each
+    # channel is an arithmetic progression of (2 * numerator + m), so rounded
+    # values come from range() and floordiv without a per-pixel Python loop.
+    k = len(stops) - 1
+    m = count - 1
+    out = bytearray(3 * count)
+    for channel in range(3):
+        parts = []
+        for s in range(k):
+            j0 = -(-s * m // k)
+            j1 = -(-(s + 1) * m // k) if s < k - 1 else count
+            if j1 <= j0:
+                continue
+            a = stops[s][channel]
+            d = stops[s + 1][channel] - a
+            first = 2 * (a * m + d * (j0 * k - s * m)) + m
+            step = 2 * d * k
+            if step:
+                values = range(first, first + step * (j1 - j0), step)
+                parts.append(bytes(map(floordiv, values, repeat(2 * m))))
+            else:
+                parts.append(bytes((first // (2 * m),)) * (j1 - j0))
+        out[channel::3] = b"".join(parts)
+    return bytes(out)
+
+
+@lru_cache(maxsize=BUFFER_CACHE_SIZE)
+def gradient_span(stops: Tuple[RGB, ...], counts: Tuple[int, ...]) -> Tuple[bytes, ...]:
+    # One gradient across several zones laid end to end (e.g. a roofline made
+    # of many zones), returned as one buffer per zone.
+    full = gradient(stops, sum(counts))
+    offsets = [0, *accumulate(3 * count for count in counts)]
+    return tuple(full[start:end] for start, end in zip(offsets, offsets[1:]))
+
+
+def to_percent(brightness: int) -> int:
+    # HA brightness (0-255) to runData brightness (0-100).
+    return min(100, max(0, round(brightness * 100 / 255)))
+
+
+def from_percent(brightness: int) -> int:
+    return min(255, max(0, round(brightness * 255 / 100)))
+
+
+def color_pattern(colors: Sequence[int], brightness: int = 100) -> Pattern:
+    # A static pattern of the given colors; a single RGB repeats over the
+    # whole zone, a full pixel buffer sets every pixel.
+    return make(
+        colors=colors if isinstance(colors, bytes) else tuple(colors),
+        type="Color",
+        run_data=RunData(brightness=brightness),
+    )
+
+
+def normalize_stops(colors: Iterable[Sequence[int]]) -> Tuple[RGB, ...]:
+    stops = tuple(tuple(int(c) for c in color) for color in colors)
+    if not stops or any(len(stop) != 3 or not all(0 <= c <= 255 for c in stop) for stop in stops):
+        raise ValueError("colors must be a list of [r, g, b] values from 0 to 255")
+    return stops
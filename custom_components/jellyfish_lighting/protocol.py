@@ -0,0 +1,441 @@
+import dataclasses
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, FrozenSet, Hashable, List, NamedTuple, Optional, Tuple
+
+from . import codec
+from .catalog import PatternCatalog
+from .const import DEFAULT_DECODE_OFFLOAD_THRESHOLD, DEFAULT_QUEUE_SIZE
+from .delta import Delta, diff_mapping
+from .metrics import ClientMetrics
+from .models import ZoneState
+
+_LOGGER = logging.getLogger(__name__)
+
+# The Jellyfish controller protocol without any I/O: text frames go in,
+# events and queued outbound frames come out. Timestamps are passed in by
+# the caller and decode timings use an injectable timer, so the same code
+# runs behind the aiohttp transport, the simulator benchmarks, or a test
+# feeding frames by hand with a fake clock.
+
+GET = "toCtlrGet"
+
+
+class PatternsUpdated(NamedTuple):
+    delta: Delta
+    folders_changed: bool
+
+
+class ZonesUpdated(NamedTuple):
+    delta: Delta
+
+
+class ZoneStatesUpdated(NamedTuple):
+    zones: FrozenSet[str]
+
+
+class Reply(NamedTuple):
+    # Answer to a toCtlrGet keyed by its get item, e.g. ("zones",).
+    key: tuple
+    value: Any
+
+
+StateKey = Tuple[str, str, int]
+
+
+def _pattern_entries(value: Any) -> Optional[List[Dict[str, Any]]]:
+    # A patternFileList's entries, or None if it is not a list. Entries that
+    # are not objects are dropped rather than breaking the catalog build.
+    if not isinstance(value, list):
+        return None
+    if all(isinstance(entry, dict) for entry in value):
+        return value
+    return [entry for entry in value if isinstance(entry, dict)]
+
+
+def state_key(file: str, data: str, state: int) -> StateKey:
+    # Any "off" is the same state regardless of the pattern it names.
+    return (file, data, 1) if state else ("", "", 0)
+
+
+class JellyfishProtocol:
+    def __init__(
+        self,
+        name: str = "",
+        max_queue: int = DEFAULT_QUEUE_SIZE,
+        decode_offload_threshold: int = DEFAULT_DECODE_OFFLOAD_THRESHOLD,
+        timer: Callable[[], float] = time.perf_counter,
+    ):
+        self.name = name
+        self._timer = timer
+        self._patterns: List[Dict[str, Any]] = []
+        self._zones: Dict[str, Any] = {}
+        self._catalog = PatternCatalog()
+        # Outbound frames, oldest first. Frames sharing a key (e.g. runPattern
+        # for the same zone set) replace the unsent older one. Values are
+        # (frame, token, time queued); the token is whatever the transport
+        # wants back when the frame is written, replaced or dropped.
+        self.max_queue = max_queue
+        self._outbox: "OrderedDict[Hashable, Tuple[str, Any, float]]" = OrderedDict()
+        self.dropped_commands = 0
+        self.superseded_commands = 0
+        # Last runPattern state per zone that was written to, or reported by,
+        # the controller. Used to skip commands that would change nothing.
+        self._confirmed: Dict[str, StateKey] = {}
+        # Last runPattern state written per zone, and when, that the controller
+        # has not echoed back yet. Echoes of older writes can arrive after a
+        # newer one.
+        self._unechoed: Dict[str, Tuple[StateKey, float]] = {}
+        self.suppressed_commands = 0
+        # Per-zone state pushed by the controller (runPattern replies and
+        # broadcasts) or confirmed by our own writes. Entities render this.
+        self._zone_states: Dict[str, ZoneState] = {}
+        # Frames at least this large should be decoded off the event loop
+        # (see decode_offloaded). Per message type decode timings.
+        self.decode_offload_threshold = decode_offload_threshold
+        self.decode_stats: Dict[str, Dict[str, float]] = {}
+        # Link and latency metrics; toCtlrGet frames record when they were
+        # written so the reply can be timed.
+        self.metrics = ClientMetrics()
+        self._sent_at: Dict[Hashable, float] = {}
+        self._ping_sent: Optional[float] = None
+        self._events: List[Any] = []
+        self._handlers: Dict[str, Callable[..., None]] = {
+            "patternFileList": self._on_pattern_file_list,
+            "zones": self._on_zones,
+            "patternFileData": self._on_pattern_file_data,
+            "runPattern": self._on_run_pattern,
+        }
+
+    @property
+    def patterns(self) -> List[Dict[str, Any]]:
+        return self._patterns
+
+    @property
+    def catalog(self) -> PatternCatalog:
+        return self._catalog
+
+    @property
+    def zones(self) -> Dict[str, Any]:
+        return self._zones
+
+    @property
+    def zone_states(self) -> Dict[str, ZoneState]:
+        return self._zone_states
+
+    @property
+    def queue_stats(self) -> Dict[str, int]:
+        return {
+            "depth": len(self._outbox),
+            "dropped": self.dropped_commands,
+            "superseded": self.superseded_commands,
+            "suppressed": self.suppressed_commands,
+        }
+
+    def restore(self, zones: Dict[str, Any], patterns: List[Dict[str, Any]]):
+        # Last known zones/patterns (e.g. from a snapshot) before connecting.
+        self._zones = zones
+        self._patterns = patterns
+        self._catalog = PatternCatalog.build(patterns, self._catalog.version + 1)
+
+    # Connection lifecycle
+
+    def connection_made(self, now: float):
+        # The controller may have changed while we were away.
+        self._confirmed.clear()
+        self._unechoed.clear()
+        self._sent_at.clear()
+        self._ping_sent = None
+        self.metrics.mark_up(now)
+        self.queue(codec.PATTERN_LIST_FRAME, (GET, "patternFileList"), now=now)
+        self.queue(codec.ZONES_FRAME, (GET, "zones"), now=now)
+
+    def connection_lost(self, now: float):
+        self._ping_sent = None
+        self.metrics.mark_down(now)
+
+    def ping(self, now: float) -> bool:
+        # False when the previous ping is still unanswered: the link is dead.
+        if self._ping_sent is not None:
+            return False
+        self._ping_sent = now
+        return True
+
+    def pong(self, now: float):
+        if self._ping_sent is not None:
+            self.metrics.observe_heartbeat(now - self._ping_sent)
+            self._ping_sent = None
+
+    # Outbound queue
+
+    def queue(
+        self, frame: str, key: Optional[Hashable] = None, token: Any = None, now: float = 0.0
+    ) -> List[Any]:
+        # Returns the tokens of frames this one replaced or pushed out.
+        if key is None:
+            key = object()
+        displaced = []
+        previous = self._outbox.pop(key, None)
+        if previous is not None:
+            self.superseded_commands += 1
+            displaced.append(previous[1])
+        elif len(self._outbox) >= self.max_queue:
+            _, (_, oldest, _) = self._outbox.popitem(last=False)
+            self.dropped_commands += 1
+            _LOGGER.warning(
+                "Outbound queue for %s full (%d), dropping oldest command",
+                self.name, self.max_queue,
+            )
+            displaced.append(oldest)
+        self._outbox[key] = (frame, token, now)
+        return displaced
+
+    def pop_frame(self) -> Optional[Tuple[Hashable, str, Any, float]]:
+        if not self._outbox:
+            return None
+        key, (frame, token, queued) = self._outbox.popitem(last=False)
+        return key, frame, token, queued
+
+    def requeue(self, key: Hashable, frame: str, token: Any, queued: float):
+        # A frame that failed to write goes back to the front, unless a newer
+        # one for the same key arrived meanwhile.
+        if key not in self._outbox:
+            self._outbox[key] = (frame, token, queued)
+            self._outbox.move_to_end(key, last=False)
+
+    def discard(self, key: Hashable) -> Any:
+        queued = self._outbox.pop(key, None)
+        return queued[1] if queued is not None else None
+
+    def clear_outbox(self) -> List[Any]:
+        outbox, self._outbox = self._outbox, OrderedDict()
+        return [token for _, token, _ in outbox.values()]
+
+    def frame_written(self, key: Hashable, frame: str, queued: float, now: float):
+        metrics = self.metrics
+        metrics.frames_out += 1
+        metrics.bytes_out += len(frame)
+        metrics.outbound_wait.observe(now - queued)
+        if isinstance(key, tuple) and key[0] == GET:
+            self._sent_at[key] = now
+
+    # Commands
+
+    @staticmethod
+    def get_frame(item: List[Any]) -> Tuple[str, tuple]:
+        return codec.encode_get([item]), (GET,) + tuple(item)
+
+    @staticmethod
+    def run_pattern_frame(
+        file: str, data: str, state: int, zone_names: List[str]
+    ) -> Tuple[str, tuple]:
+        return (
+            codec.encode_run_pattern(file, data, state, zone_names),
+            ("runPattern", frozenset(zone_names)),
+        )
+
+    def filter_run_pattern(
+        self, file: str, data: str, state: int, zone_names: List[str], force: bool = False
+    ) -> List[str]:
+        # Zones the command would change; empty means suppressed.
+        if not force:
+            target = state_key(file, data, state)
+            zone_names = [z for z in zone_names if self._confirmed.get(z) != target]
+            if not zone_names:
+                self.suppressed_commands += 1
+                return zone_names
+        # Forget the confirmed state until this command is written, so a
+        # later command back to the old state is not wrongly suppressed.
+        for zone in zone_names:
+            self._confirmed.pop(zone, None)
+        return zone_names
+
+    def run_pattern_written(
+        self, zone_names: List[str], zone_state: ZoneState, now: float
+    ) -> List[Any]:
+        state = state_key(*zone_state)
+        for zone in zone_names:
+            self._confirmed[zone] = state
+            self._unechoed[zone] = (state, now)
+        self._apply_zone_states(zone_names, zone_state)
+        return self._take_events()
+
+    # Inbound
+
+    def needs_offload(self, raw: str) -> bool:
+        return len(raw) >= self.decode_offload_threshold
+
+    @staticmethod
+    def decode_offloaded(raw: str, catalog_version: int):
+        # Safe to run in a worker thread: decode and, for pattern lists, build
+        # the catalog index so neither blocks the caller's loop.
+        payload = codec.loads(raw)
+        catalog = None
+        if isinstance(payload, dict):
+            patterns = _pattern_entries(payload.get("patternFileList"))
+            if patterns is not None:
+                catalog = PatternCatalog.build(patterns, catalog_version)
+        return payload, catalog
+
+    def receive(self, raw: str, now: float) -> List[Any]:
+        start = self._timer()
+        try:
+            payload = codec.loads(raw)
+        except Exception:
+            self._count_in(raw)
+            _LOGGER.debug("Non-JSON from controller: %s", raw[:256])
+            return []
+        return self.receive_decoded(raw, payload, self._timer() - start, now)
+
+    def receive_decoded(
+        self,
+        raw: str,
+        payload: Any,
+        elapsed: float,
+        now: float,
+        catalog: Optional[PatternCatalog] = None,
+        offloaded: bool = False,
+    ) -> List[Any]:
+        self._count_in(raw)
+        if not isinstance(payload, dict) or payload.get("cmd") != "fromCtlr":
+            return []
+        self._record_decode(payload, len(raw), elapsed, offloaded)
+        # Route each fromCtlr key through the handler table.
+        handlers = self._handlers
+        for key, value in payload.items():
+            if key == "patternFileList" and catalog is not None:
+                self._on_pattern_file_list(value, now, catalog)
+                continue
+            handler = handlers.get(key)
+            if handler is not None:
+                handler(value, now)
+        return self._take_events()
+
+    def _count_in(self, raw: str):
+        metrics = self.metrics
+        metrics.frames_in += 1
+        # Text frames, counted in characters rather than encoded bytes.
+        metrics.bytes_in += len(raw)
+
+    def _take_events(self) -> List[Any]:
+        events, self._events = self._events, []
+        return events
+
+    def _record_decode(self, payload: Dict[str, Any], size: int, elapsed: float, offloaded: bool):
+        msg_type = next((key for key in payload if key != "cmd"), "unknown")
+        stats = self.decode_stats.get(msg_type)
+        if stats is None:
+            stats = self.decode_stats[msg_type] = {
+                "count": 0, "offloaded": 0, "total_ms": 0.0, "max_ms": 0.0, "max_bytes": 0
+            }
+        elapsed_ms = elapsed * 1000
+        stats["count"] += 1
+        stats["total_ms"] += elapsed_ms
+        stats["max_ms"] = max(stats["max_ms"], elapsed_ms)
+        stats["max_bytes"] = max(stats["max_bytes"], size)
+        if offloaded:
+            stats["offloaded"] += 1
+            _LOGGER.debug(
+                "Decoded %d byte %s from %s off the loop in %.1f ms",
+                size, msg_type, self.name, elapsed_ms,
+            )
+
+    # Unchanged lists (e.g. the live refresh matching the startup snapshot)
+    # are not re-applied or reported.
+    def _on_pattern_file_list(
+        self, patterns: Any, now: float, catalog: Optional[PatternCatalog] = None
+    ):
+        patterns = _pattern_entries(patterns)
+        if patterns is None:
+            _LOGGER.debug("Ignoring malformed patternFileList from %s", self.name)
+            return
+        if patterns != self._patterns:
+            old = self._catalog
+            self._patterns = patterns
+            if catalog is None:
+                catalog = PatternCatalog.build(patterns, old.version + 1)
+            elif catalog.version != old.version + 1:
+                catalog = dataclasses.replace(catalog, version=old.version + 1)
+            self._catalog = catalog
+            self._events.append(
+                PatternsUpdated(
+                    diff_mapping(old.signatures, catalog.signatures),
+                    old.folders != catalog.folders,
+                )
+            )
+        self._resolve(("patternFileList",), self._patterns, now)
+
+    def _on_zones(self, zones: Any, now: float):
+        if not isinstance(zones, dict):
+            _LOGGER.debug("Ignoring malformed zones from %s: %r", self.name, zones)
+            return
+        if zones != self._zones:
+            delta = diff_mapping(self._zones, zones)
+            self._zones = zones
+            self._events.append(ZonesUpdated(delta))
+        self._resolve(("zones",), self._zones, now)
+        # One frame asking for the runPattern state of every zone; replies
+        # arrive as fromCtlr runPattern messages.
+        if self._zones:
+            self.queue(
+                codec.encode_get(["runPattern", zone] for zone in self._zones),
+                (GET, "runPattern"),
+                now=now,
+            )
+
+    def _on_pattern_file_data(self, data: Any, now: float):
+        if not isinstance(data, dict):
+            data = {}
+        self._resolve(("patternFileData", data.get("folders"), data.get("name")), data, now)
+
+    def _on_run_pattern(self, run: Any, now: float):
+        if not isinstance(run, dict):
+            run = {}
+        try:
+            zone_state = ZoneState.from_run_pattern(run)
+            if not isinstance(zone_state.file, str) or not isinstance(zone_state.data, str):
+                raise TypeError
+        except (TypeError, ValueError):
+            _LOGGER.debug("Ignoring malformed runPattern from %s: %r", self.name, run)
+            return
+        zones = run.get("zoneName") or []
+        if isinstance(zones, str):
+            zones = [zones]
+        elif isinstance(zones, list):
+            zones = [zone for zone in zones if isinstance(zone, str)]
+        else:
+            zones = []
+        state = state_key(*zone_state)
+        sent = self._sent_at.pop((GET, "runPattern"), None)
+        if sent is not None:
+            self.metrics.observe_latency("zoneStates", now - sent)
+        timed = False
+        for zone in zones:
+            written = self._unechoed.get(zone)
+            if written is None or written[0] == state:
+                if written is not None and not timed:
+                    # One sample per echoed frame, not per zone in it.
+                    self.metrics.observe_latency("runPattern", now - written[1])
+                    timed = True
+                self._unechoed.pop(zone, None)
+                self._confirmed[zone] = state
+            else:
+                # A stale echo of an earlier write, or another client racing
+                # ours: the final state is unknown, so suppress nothing.
+                self._confirmed.pop(zone, None)
+        self._apply_zone_states(zones, zone_state)
+
+    def _apply_zone_states(self, zones: List[str], zone_state: ZoneState):
+        changed = [z for z in zones if self._zone_states.get(z) != zone_state]
+        if not changed:
+            return
+        for zone in changed:
+            self._zone_states[zone] = zone_state
+        self._events.append(ZoneStatesUpdated(frozenset(changed)))
+
+    def _resolve(self, key: tuple, value: Any, now: float):
+        sent = self._sent_at.pop((GET,) + key, None)
+        if sent is not None:
+            self.metrics.observe_latency(key[0], now - sent)
+        self._events.append(Reply(key, value))
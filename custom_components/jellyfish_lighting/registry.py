@@ -0,0 +1,61 @@
+import logging
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from homeassistant.core import callback
+
+from .websocket_api import JellyfishClient
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class ZoneRegistry:
+    # Domain-wide zone name -> client index used to route service calls
+    # without scanning every controller.
+
+    def __init__(self):
+        self._zones: Dict[str, JellyfishClient] = {}
+        self._clients: Dict[JellyfishClient, set] = {}
+
+    @property
+    def clients(self) -> List[JellyfishClient]:
+        return list(self._clients)
+
+    @callback
+    def async_update_client(self, client: JellyfishClient):
+        zones = set(client.zones)
+        previous = self._clients.get(client, set())
+        for zone in previous - zones:
+            if self._zones.get(zone) is client:
+                del self._zones[zone]
+        for zone in zones - previous:
+            owner = self._zones.get(zone)
+            if owner is not None and owner is not client:
+                _LOGGER.warning(
+                    "Zone '%s' exists on %s and %s; routing to %s",
+                    zone, owner.host, client.host, client.host,
+                )
+            self._zones[zone] = client
+        self._clients[client] = zones
+
+    @callback
+    def async_remove_client(self, client: JellyfishClient):
+        for zone in self._clients.pop(client, ()):
+            if self._zones.get(zone) is client:
+                del self._zones[zone]
+
+    def get(self, zone: str) -> Optional[JellyfishClient]:
+        return self._zones.get(zone)
+
+    def group_by_client(
+        self, zones: Iterable[str]
+    ) -> Tuple[Dict[JellyfishClient, List[str]], List[str]]:
+        # Split zone names per controller; unknown zones are returned apart.
+        groups: Dict[JellyfishClient, List[str]] = {}
+        missing: List[str] = []
+        for zone in dict.fromkeys(zones):
+            owner = self._zones.get(zone)
+            if owner is None:
+                missing.append(zone)
+            else:
+                groups.setdefault(owner, []).append(zone)
+        return groups, missing
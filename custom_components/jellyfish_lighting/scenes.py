@@ -0,0 +1,64 @@
+import logging
+from typing import Any, Dict, List, Mapping, Optional
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN, SCENE_STORAGE_VERSION
+from .models import ZoneState
+
+_LOGGER = logging.getLogger(__name__)
+
+# Controller host -> zone -> state.
+Scene = Dict[str, Dict[str, ZoneState]]
+
+
+class SceneStore:
+    # Named snapshots of what every zone runs, across all controllers,
+    # persisted with HA storage. Stored as
+    # {"scenes": {name: {host: {zone: [file, data, state]}}}}.
+
+    def __init__(self, hass: HomeAssistant):
+        self._store = Store(hass, SCENE_STORAGE_VERSION, f"{DOMAIN}.scenes")
+        self._scenes: Dict[str, Scene] = {}
+
+    @property
+    def names(self) -> List[str]:
+        return sorted(self._scenes)
+
+    async def async_load(self):
+        stored = await self._store.async_load()
+        if not stored:
+            return
+        for name, hosts in (stored.get("scenes") or {}).items():
+            self._scenes[name] = {
+                host: {zone: ZoneState(*state) for zone, state in zones.items()}
+                for host, zones in hosts.items()
+            }
+        _LOGGER.debug("Loaded %d Jellyfish scenes", len(self._scenes))
+
+    @callback
+    def get(self, name: str) -> Optional[Scene]:
+        return self._scenes.get(name)
+
+    async def async_save_scene(self, name: str, scene: Mapping[str, Mapping[str, ZoneState]]):
+        self._scenes[name] = {host: dict(zones) for host, zones in scene.items()}
+        await self._store.async_save(self._data_to_save())
+
+    async def async_delete_scene(self, name: str) -> bool:
+        if self._scenes.pop(name, None) is None:
+            return False
+        await self._store.async_save(self._data_to_save())
+        return True
+
+    @callback
+    def _data_to_save(self) -> Dict[str, Any]:
+        return {
+            "scenes": {
+                name: {
+                    host: {zone: list(state) for zone, state in zones.items()}
+                    for host, zones in hosts.items()
+                }
+                for name, hosts in self._scenes.items()
+            }
+        }
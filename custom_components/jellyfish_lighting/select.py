@@ -1,8 +1,17 @@
 import logging
+from typing import FrozenSet
+
 from homeassistant.components.select import SelectEntity
-from homeassistant.helpers.entity import DeviceInfo
+from homeassistant.core import callback
 from homeassistant.helpers.dispatcher import async_dispatcher_connect, async_dispatcher_send
-from .const import DOMAIN
+from .const import (
+    DOMAIN,
+    SIGNAL_PATTERNS_UPDATED,
+    SIGNAL_ZONE_STATE_UPDATED,
+    SIGNAL_ZONES_UPDATED,
+)
+from .delta import Delta
+from .entity import JellyfishEntity
 from .websocket_api import JellyfishClient
 
 _LOGGER = logging.getLogger(__name__)
@@ -12,47 +21,102 @@ async def async_setup_entry(hass, entry, async_add_entities):
     entities = {}
     added_zones = set()
 
-    async def add_zone_select_entities():
+    @callback
+    def add_zone_select_entities():
         new_entities = []
         for zone_name in client.zones.keys():
             if zone_name not in added_zones:
                 # Find the corresponding light entity if needed
-                select_entity = JellyfishPatternSelect(client, zone_name)
+                select_entity = JellyfishPatternSelect(client, entry.entry_id, zone_name)
                 entities[zone_name] = select_entity
                 new_entities.append(select_entity)
                 added_zones.add(zone_name)
         if new_entities:
             async_add_entities(new_entities, True)
 
-    async_dispatcher_connect(hass, f"{DOMAIN}_zones_updated", add_zone_select_entities)
-    await client.request_zones()
-    await add_zone_select_entities()
+    @callback
+    def async_zones_updated(updated: JellyfishClient, delta: Delta):
+        if updated is not client:
+            return
+        add_zone_select_entities()
+        # Zones that disappear keep their entity but go unavailable.
+        for zone_name in delta.removed | delta.added:
+            if zone_name in entities:
+                entities[zone_name].async_set_zone_available(zone_name in client.zones)
+
+    entry.async_on_unload(
+        async_dispatcher_connect(hass, SIGNAL_ZONES_UPDATED, async_zones_updated)
+    )
+    # Zones restored from the snapshot; the client requests fresh ones on connect.
+    add_zone_select_entities()
+
+class JellyfishPatternSelect(JellyfishEntity, SelectEntity):
+    _attr_should_poll = False
 
-class JellyfishPatternSelect(SelectEntity):
-    def __init__(self, client: JellyfishClient, zone_name: str):
-        self._client = client
+    def __init__(self, client: JellyfishClient, entry_id: str, zone_name: str):
+        super().__init__(client, entry_id)
         self._zone_name = zone_name
-        self._attr_name = f"Jellyfish {zone_name} Pattern"
+        self._attr_name = f"{zone_name} pattern"
+        self._catalog_version = None
         self._attr_options = self._get_patterns()
         self._attr_current_option = None
         self._unsub = None
+        self._apply_zone_state()
 
     async def async_added_to_hass(self):
         # Listen for pattern updates
         self._unsub = async_dispatcher_connect(
-            self.hass, f"{DOMAIN}_patterns_updated", self._async_update_patterns
+            self.hass, SIGNAL_PATTERNS_UPDATED, self._async_patterns_updated
         )
-        if not self._client.patterns:
-            await self._client.request_pattern_list()
-        await self._async_update_patterns()
+        self.async_on_remove(
+            async_dispatcher_connect(
+                self.hass, SIGNAL_ZONE_STATE_UPDATED, self._async_zone_state_updated
+            )
+        )
+        self._attr_options = self._get_patterns()
+        self._apply_zone_state()
+
+    def _apply_zone_state(self):
+        zone_state = self._client.zone_states.get(self._zone_name)
+        if zone_state is None:
+            return
+        name = zone_state.pattern_name
+        self._attr_current_option = name if name in self._attr_options else None
+
+    @callback
+    def _async_zone_state_updated(self, updated: JellyfishClient, zones: FrozenSet[str]):
+        if updated is not self._client or self._zone_name not in zones:
+            return
+        previous = self._attr_current_option
+        self._apply_zone_state()
+        if self._attr_current_option != previous:
+            self.async_write_ha_state()
 
     def _get_patterns(self):
-        patterns = self._client.patterns
-        return [pat.get("name", "Unknown") for pat in patterns]
+        catalog = self._client.catalog
+        if catalog.version == self._catalog_version:
+            return self._attr_options
+        self._catalog_version = catalog.version
+        return list(catalog.names)
 
-    async def _async_update_patterns(self):
-        self._attr_options = self._get_patterns()
-        self.async_write_ha_state()
+    @callback
+    def _async_patterns_updated(self, updated: JellyfishClient, delta: Delta):
+        if updated is not self._client:
+            return
+        # Only names matter here; changes to a file's listing entry that keep
+        # the option list identical do not cost a state write.
+        options = self._get_patterns()
+        if options != self._attr_options:
+            self._attr_options = options
+            self._apply_zone_state()
+            self.async_write_ha_state()
+
+    @callback
+    def async_set_zone_available(self, available: bool):
+        if self._attr_available != available:
+            self._attr_available = available
+            if self.hass is not None:
+                self.async_write_ha_state()
 
     async def async_will_remove_from_hass(self):
         if self._unsub:
@@ -72,6 +136,5 @@ class JellyfishPatternSelect(SelectEntity):
         return self._attr_current_option
 
     async def async_select_option(self, option: str):
-        await self._client.run_pattern(file=option, zone_names=[self._zone_name], state=1)
-        self._attr_current_option = option
-        self.async_write_ha_state()
+        file = self._client.catalog.file_for(option) or option
+        await self._client.run_pattern(file=file, zone_names=[self._zone_name], state=1)
@@ -0,0 +1,198 @@
+import logging
+import time
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Any, Callable, Optional
+
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorEntity,
+    SensorEntityDescription,
+    SensorStateClass,
+)
+from homeassistant.const import EntityCategory, UnitOfInformation, UnitOfTime
+from homeassistant.core import callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+
+from .const import DOMAIN, SIGNAL_PATTERNS_UPDATED
+from .delta import Delta
+from .entity import JellyfishEntity
+from .metrics import Histogram
+from .websocket_api import JellyfishClient
+
+_LOGGER = logging.getLogger(__name__)
+
+# Metrics are read from counters the client keeps anyway, so polling them is
+# cheap and keeps the message path free of entity updates.
+SCAN_INTERVAL = timedelta(seconds=30)
+
+
+def _p95_ms(histogram: Optional[Histogram]) -> Optional[float]:
+    if histogram is None:
+        return None
+    value = histogram.quantile(0.95)
+    return None if value is None else round(value * 1000, 1)
+
+
+def _ms(seconds: Optional[float]) -> Optional[float]:
+    return None if seconds is None else round(seconds * 1000, 1)
+
+
+@dataclass(frozen=True, kw_only=True)
+class JellyfishSensorEntityDescription(SensorEntityDescription):
+    value_fn: Callable[[JellyfishClient], Any]
+
+
+SENSORS = (
+    JellyfishSensorEntityDescription(
+        key="command_latency",
+        name="Command latency",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda client: _p95_ms(client.metrics.latency.get("runPattern")),
+    ),
+    JellyfishSensorEntityDescription(
+        key="outbound_wait",
+        name="Outbound wait",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda client: _p95_ms(client.metrics.outbound_wait),
+    ),
+    JellyfishSensorEntityDescription(
+        key="heartbeat_rtt",
+        name="Heartbeat round trip",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda client: _ms(client.metrics.heartbeat_rtt),
+    ),
+    JellyfishSensorEntityDescription(
+        key="queue_depth",
+        name="Queue depth",
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda client: client.queue_stats["depth"],
+    ),
+    JellyfishSensorEntityDescription(
+        key="reconnects",
+        name="Reconnects",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda client: client.metrics.reconnects,
+    ),
+    JellyfishSensorEntityDescription(
+        key="downtime",
+        name="Downtime",
+        native_unit_of_measurement=UnitOfTime.SECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda client: round(client.metrics.total_downtime(time.monotonic()), 1),
+    ),
+    JellyfishSensorEntityDescription(
+        key="frames_in",
+        name="Frames received",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda client: client.metrics.frames_in,
+    ),
+    JellyfishSensorEntityDescription(
+        key="frames_out",
+        name="Frames sent",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda client: client.metrics.frames_out,
+    ),
+    JellyfishSensorEntityDescription(
+        key="bytes_in",
+        name="Data received",
+        native_unit_of_measurement=UnitOfInformation.BYTES,
+        device_class=SensorDeviceClass.DATA_SIZE,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda client: client.metrics.bytes_in,
+    ),
+    JellyfishSensorEntityDescription(
+        key="bytes_out",
+        name="Data sent",
+        native_unit_of_measurement=UnitOfInformation.BYTES,
+        device_class=SensorDeviceClass.DATA_SIZE,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda client: client.metrics.bytes_out,
+    ),
+)
+
+
+async def async_setup_entry(hass, entry, async_add_entities):
+    client: JellyfishClient = hass.data[DOMAIN][entry.entry_id]["client"]
+    async_add_entities(
+        [
+            JellyfishPatternsSensor(client, entry.entry_id),
+            *(
+                JellyfishMetricSensor(client, entry.entry_id, description)
+                for description in SENSORS
+            ),
+        ]
+    )
+
+
+class JellyfishPatternsSensor(JellyfishEntity, SensorEntity):
+    # The controller's pattern catalog, once per controller rather than on
+    # every zone entity. The listing can be large, so it stays out of the
+    # recorder; only the pattern count is recorded.
+    _attr_should_poll = False
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_icon = "mdi:palette"
+    _unrecorded_attributes = frozenset({"available_folders", "available_patterns"})
+
+    def __init__(self, client: JellyfishClient, entry_id: str):
+        super().__init__(client, entry_id)
+        self._attr_name = "Patterns"
+        self._attr_unique_id = f"jellyfish_{client.host}_patterns"
+        self._catalog_version = None
+        self._catalog_attrs = {}
+
+    async def async_added_to_hass(self):
+        self.async_on_remove(
+            async_dispatcher_connect(
+                self.hass, SIGNAL_PATTERNS_UPDATED, self._async_patterns_updated
+            )
+        )
+
+    @callback
+    def _async_patterns_updated(self, updated: JellyfishClient, delta: Delta):
+        if updated is self._client:
+            self.async_write_ha_state()
+
+    @property
+    def native_value(self):
+        return len(self._client.catalog.entries)
+
+    @property
+    def extra_state_attributes(self):
+        # Only rebuild the view when the catalog version changes.
+        catalog = self._client.catalog
+        if catalog.version != self._catalog_version:
+            self._catalog_version = catalog.version
+            self._catalog_attrs = {
+                "available_folders": list(catalog.folders),
+                "available_patterns": catalog.folders,
+            }
+        return self._catalog_attrs
+
+
+class JellyfishMetricSensor(JellyfishEntity, SensorEntity):
+    # One set per controller; disabled until someone needs to look.
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+    entity_description: JellyfishSensorEntityDescription
+
+    def __init__(
+        self,
+        client: JellyfishClient,
+        entry_id: str,
+        description: JellyfishSensorEntityDescription,
+    ):
+        super().__init__(client, entry_id)
+        self.entity_description = description
+        self._attr_unique_id = f"jellyfish_{client.host}_{description.key}"
+
+    @property
+    def native_value(self):
+        return self.entity_description.value_fn(self._client)
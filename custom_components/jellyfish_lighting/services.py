@@ -0,0 +1,354 @@
+import asyncio
+import logging
+from typing import Any, List
+
+import voluptuous as vol
+
+from homeassistant.core import HomeAssistant, ServiceCall, SupportsResponse
+from homeassistant.exceptions import HomeAssistantError
+import homeassistant.helpers.config_validation as cv
+
+from .const import (
+    DOMAIN,
+    DATA_HUB,
+    DATA_SCENES,
+    DATA_ZONE_REGISTRY,
+    SERVICE_RUN_PATTERN,
+    SERVICE_RUN_PATTERN_ADV,
+    SERVICE_GET_PATTERN_DATA,
+    SERVICE_SET_ZONE_PATTERN,
+    SERVICE_SET_GRADIENT,
+    SERVICE_SAVE_SCENE,
+    SERVICE_RESTORE_SCENE,
+    SERVICE_DELETE_SCENE,
+    SERVICE_MIRROR_PATTERNS,
+)
+from . import pattern as pattern_model, pixels
+from .pattern import InvalidPattern
+from .hub import JellyfishHub
+from .mirror import PatternMirror
+from .registry import ZoneRegistry
+from .scenes import SceneStore
+from .websocket_api import JellyfishClient
+
+_LOGGER = logging.getLogger(__name__)
+
+# Service schemas. Defaults stay in the handlers; these reject missing
+# required fields and wrong types before a handler runs.
+_ZONES = vol.All(cv.ensure_list, [cv.string])
+_STATE = vol.All(vol.Coerce(int), vol.In([0, 1]))
+
+_TARGET_ZONES = {
+    vol.Optional("zone_names"): _ZONES,
+    vol.Optional("all_zones"): cv.boolean,
+}
+
+_CONTROLLER = {
+    vol.Optional("host"): cv.string,
+    vol.Optional("zone"): cv.string,
+}
+
+RUN_PATTERN_SCHEMA = vol.Schema({
+    vol.Optional("file"): cv.string,
+    vol.Optional("state"): _STATE,
+    vol.Optional("force"): cv.boolean,
+    **_TARGET_ZONES,
+})
+
+RUN_PATTERN_ADV_SCHEMA = vol.Schema({
+    vol.Required("data"): vol.Any(cv.string, dict),
+    vol.Optional("state"): _STATE,
+    vol.Optional("force"): cv.boolean,
+    **_TARGET_ZONES,
+})
+
+GET_PATTERN_DATA_SCHEMA = vol.Schema({
+    vol.Required("folder"): cv.string,
+    vol.Required("filename"): cv.string,
+    vol.Optional("refresh"): cv.boolean,
+    **_CONTROLLER,
+})
+
+SET_ZONE_PATTERN_SCHEMA = vol.Schema({
+    vol.Required("pattern"): cv.string,
+    vol.Optional("zone"): _ZONES,
+    vol.Optional("zones"): _ZONES,
+})
+
+SET_GRADIENT_SCHEMA = vol.Schema({
+    vol.Required("colors"): vol.All(cv.ensure_list, vol.Length(min=1)),
+    vol.Optional("brightness"): vol.All(vol.Coerce(int), vol.Range(min=0, max=255)),
+    vol.Optional("span"): cv.boolean,
+    **_TARGET_ZONES,
+})
+
+SAVE_SCENE_SCHEMA = vol.Schema({
+    vol.Required("name"): cv.string,
+    vol.Optional("zone_names"): _ZONES,
+})
+
+RESTORE_SCENE_SCHEMA = vol.Schema({
+    vol.Required("name"): cv.string,
+    vol.Optional("force"): cv.boolean,
+})
+
+DELETE_SCENE_SCHEMA = vol.Schema({
+    vol.Required("name"): cv.string,
+})
+
+MIRROR_PATTERNS_SCHEMA = vol.Schema({
+    vol.Optional("refresh"): cv.boolean,
+    **_CONTROLLER,
+})
+
+
+def _as_list(value: Any) -> List[str]:
+    if not value:
+        return []
+    if isinstance(value, str):
+        return [value]
+    return list(value)
+
+
+def _registry(hass: HomeAssistant) -> ZoneRegistry:
+    return hass.data[DOMAIN][DATA_ZONE_REGISTRY]
+
+
+def _hub(hass: HomeAssistant) -> JellyfishHub:
+    return hass.data[DOMAIN][DATA_HUB]
+
+
+def _scenes(hass: HomeAssistant) -> SceneStore:
+    return hass.data[DOMAIN][DATA_SCENES]
+
+
+def _mirror_for(hass: HomeAssistant, client: JellyfishClient) -> PatternMirror:
+    for data in hass.data[DOMAIN].values():
+        if isinstance(data, dict) and data.get("client") is client:
+            return data["mirror"]
+    raise HomeAssistantError(f"No Jellyfish controller at {client.host}")
+
+
+def _target_zones(hass: HomeAssistant, call: ServiceCall) -> List[str]:
+    # A forgotten zone_names must not switch the whole property; every zone
+    # has to be asked for with all_zones.
+    if call.data.get("all_zones", False):
+        return [zone for client in _registry(hass).clients for zone in client.zones]
+    zones = _as_list(call.data.get("zone_names"))
+    if not zones:
+        raise HomeAssistantError("No zones given; pass zone_names, or all_zones: true")
+    return zones
+
+
+def _client_for(hass: HomeAssistant, call: ServiceCall) -> JellyfishClient:
+    registry = _registry(hass)
+    host = call.data.get("host")
+    zone = call.data.get("zone")
+    if host:
+        for client in registry.clients:
+            if client.host == host:
+                return client
+        raise HomeAssistantError(f"No Jellyfish controller at {host}")
+    if zone:
+        owner = registry.get(zone)
+        if owner is None:
+            raise HomeAssistantError(f"Zone '{zone}' not found")
+        return owner
+    clients = registry.clients
+    if len(clients) != 1:
+        raise HomeAssistantError("Several controllers are configured; pass host or zone")
+    return clients[0]
+
+
+def async_setup_services(hass: HomeAssistant):
+    async def async_run_pattern(call: ServiceCall):
+        await _hub(hass).async_run_pattern(
+            call.data.get("file", ""),
+            _target_zones(hass, call),
+            state=call.data.get("state", 1),
+            force=call.data.get("force", False),
+        )
+
+    async def async_run_pattern_adv(call: ServiceCall):
+        # Parse and validate once, before anything is sent to any controller.
+        try:
+            data = pattern_model.coerce(call.data.get("data", ""))
+        except InvalidPattern as exc:
+            raise HomeAssistantError(f"Invalid pattern data: {exc}") from exc
+        await _hub(hass).async_run_pattern_advanced(
+            data,
+            _target_zones(hass, call),
+            state=call.data.get("state", 1),
+            force=call.data.get("force", False),
+        )
+
+    async def async_get_pattern_data(call: ServiceCall):
+        folder = call.data.get("folder")
+        filename = call.data.get("filename")
+        client = _client_for(hass, call)
+        try:
+            return await client.get_pattern_file_data(
+                folder, filename, refresh=call.data.get("refresh", False)
+            )
+        except (asyncio.TimeoutError, ConnectionError) as exc:
+            # Controller unreachable: serve the mirrored copy if there is one.
+            mirrored = await _mirror_for(hass, client).async_read(folder, filename)
+            if mirrored is not None:
+                return mirrored
+            raise HomeAssistantError(
+                f"Could not fetch pattern {folder}/{filename}: {exc}"
+            ) from exc
+
+    async def async_set_zone_pattern(call: ServiceCall):
+        pattern = call.data.get("pattern")
+        zones = _as_list(call.data.get("zone")) + _as_list(call.data.get("zones"))
+        if not zones:
+            raise HomeAssistantError("No zones given; pass zone or zones")
+        await _hub(hass).async_fan_out(
+            zones,
+            lambda client, names: client.run_pattern(
+                file=client.catalog.file_for(pattern) or pattern, zone_names=names
+            ),
+        )
+
+    async def async_set_gradient(call: ServiceCall):
+        try:
+            stops = pixels.normalize_stops(call.data.get("colors") or [])
+        except (TypeError, ValueError) as exc:
+            raise HomeAssistantError(f"Invalid gradient colors: {exc}") from exc
+        percent = pixels.to_percent(call.data.get("brightness", 255))
+        registry = _registry(hass)
+        zones = _target_zones(hass, call)
+        counts = {}
+        for zone in zones:
+            owner = registry.get(zone)
+            count = pixels.pixel_count(owner.zones.get(zone)) if owner else 0
+            if count:
+                counts[zone] = count
+            else:
+                _LOGGER.warning("No pixel count for zone %s, skipping gradient", zone)
+        if call.data.get("span", False):
+            # One gradient running across the zones in the order given.
+            buffers = pixels.gradient_span(stops, tuple(counts.values()))
+        else:
+            buffers = [pixels.gradient(stops, count) for count in counts.values()]
+        patterns = {
+            zone: pixels.color_pattern(buffer, percent) for zone, buffer in zip(counts, buffers)
+        }
+        # Zones with the same pattern are merged into one frame by the
+        # client's batching window.
+        await _hub(hass).async_fan_out(
+            list(patterns),
+            lambda client, names: asyncio.gather(
+                *(client.run_pattern_advanced(data=patterns[zone], zone_names=[zone]) for zone in names)
+            ),
+        )
+
+    async def async_save_scene(call: ServiceCall):
+        registry = _registry(hass)
+        zones = _as_list(call.data.get("zone_names"))
+        if zones:
+            groups, missing = registry.group_by_client(zones)
+            if missing:
+                _LOGGER.warning("Zones %s not found on any controller", missing)
+        else:
+            groups = {client: list(client.zones) for client in registry.clients}
+        # Zone states are pushed by the controllers, so capturing is a read
+        # of what the clients already hold.
+        scene = {}
+        for client, names in groups.items():
+            states = {zone: client.zone_states[zone] for zone in names if zone in client.zone_states}
+            unknown = [zone for zone in names if zone not in states]
+            if unknown:
+                _LOGGER.warning(
+                    "No known state for zones %s on %s, not saved", unknown, client.host
+                )
+            if states:
+                scene[client.host] = states
+        if not scene:
+            raise HomeAssistantError("No zone states known to save")
+        await _scenes(hass).async_save_scene(call.data["name"], scene)
+
+    async def async_restore_scene(call: ServiceCall):
+        name = call.data["name"]
+        scene = _scenes(hass).get(name)
+        if scene is None:
+            raise HomeAssistantError(f"No Jellyfish scene named '{name}'")
+        hub = _hub(hass)
+        clients = {client.host: client for client in hub.clients}
+        for host in scene.keys() - clients.keys():
+            _LOGGER.warning("Scene '%s' controller %s is not configured", name, host)
+        # Every controller at once; each sends one frame per distinct state.
+        results = await hub.async_for_clients(
+            [client for host, client in clients.items() if host in scene],
+            lambda client: client.apply_zone_states(
+                scene[client.host], force=call.data.get("force", False)
+            ),
+        )
+        failed = sorted(
+            client.host for client, result in results.items() if isinstance(result, Exception)
+        )
+        if failed:
+            raise HomeAssistantError(
+                f"Scene '{name}' could not be restored on {', '.join(failed)}"
+            )
+
+    async def async_delete_scene(call: ServiceCall):
+        name = call.data["name"]
+        if not await _scenes(hass).async_delete_scene(name):
+            raise HomeAssistantError(f"No Jellyfish scene named '{name}'")
+
+    async def async_mirror_patterns(call: ServiceCall):
+        if call.data.get("host") or call.data.get("zone"):
+            clients = [_client_for(hass, call)]
+        else:
+            clients = _hub(hass).clients
+        results = await _hub(hass).async_for_clients(
+            clients,
+            lambda client: _mirror_for(hass, client).async_mirror(
+                refresh=call.data.get("refresh", False)
+            ),
+        )
+        response = {}
+        for client, result in results.items():
+            if isinstance(result, Exception):
+                response[client.host] = {"error": str(result)}
+            else:
+                response[client.host] = result
+        return response
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_RUN_PATTERN, async_run_pattern, schema=RUN_PATTERN_SCHEMA
+    )
+    hass.services.async_register(
+        DOMAIN, SERVICE_RUN_PATTERN_ADV, async_run_pattern_adv, schema=RUN_PATTERN_ADV_SCHEMA
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_GET_PATTERN_DATA,
+        async_get_pattern_data,
+        schema=GET_PATTERN_DATA_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+    hass.services.async_register(
+        DOMAIN, SERVICE_SET_ZONE_PATTERN, async_set_zone_pattern, schema=SET_ZONE_PATTERN_SCHEMA
+    )
+    hass.services.async_register(
+        DOMAIN, SERVICE_SET_GRADIENT, async_set_gradient, schema=SET_GRADIENT_SCHEMA
+    )
+    hass.services.async_register(
+        DOMAIN, SERVICE_SAVE_SCENE, async_save_scene, schema=SAVE_SCENE_SCHEMA
+    )
+    hass.services.async_register(
+        DOMAIN, SERVICE_RESTORE_SCENE, async_restore_scene, schema=RESTORE_SCENE_SCHEMA
+    )
+    hass.services.async_register(
+        DOMAIN, SERVICE_DELETE_SCENE, async_delete_scene, schema=DELETE_SCENE_SCHEMA
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_MIRROR_PATTERNS,
+        async_mirror_patterns,
+        schema=MIRROR_PATTERNS_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
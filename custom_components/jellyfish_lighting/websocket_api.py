@@ -1,78 +1,241 @@
 import asyncio
-import json
 import logging
-from typing import Any, Dict, List, Optional
+import random
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Mapping, Optional, Tuple, Union
 
 from aiohttp import ClientSession, ClientWebSocketResponse, WSServerHandshakeError
 
 from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
 
-from .const import DOMAIN
+from . import pattern
+from .cache import PatternDataCache
+from .catalog import PatternCatalog
+from .metrics import ClientMetrics
+from .models import ZoneState
+from .pattern import Pattern
+from .protocol import (
+    GET,
+    JellyfishProtocol,
+    PatternsUpdated,
+    Reply,
+    ZoneStatesUpdated,
+    StateKey,
+    ZonesUpdated,
+    state_key,
+)
+from .const import (
+    DEFAULT_REQUEST_TIMEOUT,
+    DEFAULT_BATCH_WINDOW,
+    DEFAULT_CONNECT_TIMEOUT,
+    DEFAULT_DECODE_OFFLOAD_THRESHOLD,
+    DEFAULT_QUEUE_SIZE,
+    DEFAULT_WRITE_WAIT,
+    HEARTBEAT_INTERVAL,
+    RECONNECT_BACKOFF_BASE,
+    RECONNECT_BACKOFF_MAX,
+    SIGNAL_PATTERNS_UPDATED,
+    SIGNAL_ZONE_STATE_UPDATED,
+    SIGNAL_ZONES_UPDATED,
+    SNAPSHOT_SAVE_DELAY,
+    WS_PATH,
+)
 
 from homeassistant.helpers.dispatcher import async_dispatcher_send
 
 
 _LOGGER = logging.getLogger(__name__)
 
+# aiohttp transport around JellyfishProtocol: owns the socket, the writer,
+# heartbeat and reconnects, and turns protocol events into futures and
+# dispatcher signals. Controller state and message handling live in the
+# protocol.
 class JellyfishClient:
-    def __init__(self, hass: HomeAssistant, host: str, port: int = 9000):
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        host: str,
+        port: int = 9000,
+        batch_window: float = DEFAULT_BATCH_WINDOW,
+        pattern_cache: Optional[PatternDataCache] = None,
+        snapshot_store: Optional[Store] = None,
+        max_queue: int = DEFAULT_QUEUE_SIZE,
+        decode_offload_threshold: int = DEFAULT_DECODE_OFFLOAD_THRESHOLD,
+        session: Optional[ClientSession] = None,
+        connect_gate: Optional[Callable[[], Awaitable[None]]] = None,
+    ):
         self.hass = hass
         self.host = host
         self.port = port
+        self.batch_window = batch_window
+        self.pattern_cache = pattern_cache
+        self.protocol = JellyfishProtocol(host, max_queue, decode_offload_threshold)
+        # Last zones/patternFileList seen, so entities can be created at boot
+        # before the controller answers.
+        self._snapshot_store = snapshot_store
         self._ws: Optional[ClientWebSocketResponse] = None
-        self._session: Optional[ClientSession] = None
+        # A session passed in (e.g. the hub's pooled one) is not ours to close.
+        self._session: Optional[ClientSession] = session
+        self._owns_session = session is None
+        # Awaited before every connection attempt; the hub uses it to spread
+        # attempts across controllers.
+        self._connect_gate = connect_gate
         self._read_task: Optional[asyncio.Task] = None
         self._reconnect_task: Optional[asyncio.Task] = None
-        self._patterns = []
-        self._zones = {}
+        self._heartbeat_task: Optional[asyncio.Task] = None
+        self._reconnect_attempts = 0
+        self._closing = False
         self._connected_event = asyncio.Event()
+        # In-flight toCtlrGet requests keyed by the get item, e.g.
+        # ("patternFileData", folder, filename). Identical gets share one future.
+        self._pending: Dict[tuple, asyncio.Future] = {}
+        # runPattern calls collected during the batching window, keyed by
+        # (file, data, state). Values hold the ordered zone set, the future
+        # every caller in the batch waits on and the flush timer.
+        self._run_batches: Dict[
+            tuple, Tuple[Dict[str, None], asyncio.Future, asyncio.TimerHandle]
+        ] = {}
+        # Frames queued in the protocol are drained by a single writer task.
+        self._outbox_event = asyncio.Event()
+        self._writer_task: Optional[asyncio.Task] = None
+        # Called with the zones of every runPattern command before it is
+        # queued; animation frames do not count as commands.
+        self._command_listeners: List[Callable[[List[str]], None]] = []
 
     @property
     def patterns(self):
-        return self._patterns
+        return self.protocol.patterns
+
+    @property
+    def catalog(self) -> PatternCatalog:
+        return self.protocol.catalog
 
     @property
     def zones(self):
-        return self._zones
+        return self.protocol.zones
+
+    @property
+    def zone_states(self) -> Dict[str, ZoneState]:
+        return self.protocol.zone_states
+
+    @property
+    def connected(self) -> bool:
+        return self._connected_event.is_set()
+
+    @property
+    def queue_stats(self) -> Dict[str, int]:
+        return self.protocol.queue_stats
+
+    @property
+    def metrics(self) -> ClientMetrics:
+        return self.protocol.metrics
+
+    @property
+    def decode_stats(self) -> Dict[str, Dict[str, float]]:
+        return self.protocol.decode_stats
+
+    async def async_restore_snapshot(self):
+        if self._snapshot_store is None:
+            return
+        stored = await self._snapshot_store.async_load()
+        if not stored:
+            return
+        self.protocol.restore(stored.get("zones") or {}, stored.get("patterns") or [])
+        if self.pattern_cache is not None:
+            self.pattern_cache.invalidate(self.catalog.signatures)
+        _LOGGER.debug(
+            "Restored %d zones and %d patterns for %s from snapshot",
+            len(self.zones), len(self.patterns), self.host,
+        )
+
+    @callback
+    def _save_snapshot(self):
+        if self._snapshot_store is not None:
+            self._snapshot_store.async_delay_save(
+                lambda: {"zones": self.zones, "patterns": self.patterns},
+                SNAPSHOT_SAVE_DELAY,
+            )
 
     async def connect(self):
+        self._closing = False
         if self._session is None:
             self._session = ClientSession()
+            self._owns_session = True
+        if self._writer_task is None:
+            self._writer_task = asyncio.create_task(self._writer_loop())
         await self._connect_ws()
 
     async def _connect_ws(self):
-        if self._session is None:
-            self._session = ClientSession()
-        url = f"ws://{self.host}:{self.port}/ws"
+        url = f"ws://{self.host}:{self.port}{WS_PATH}"
         try:
+            if self._connect_gate is not None:
+                await self._connect_gate()
+            if self._closing:
+                return
             _LOGGER.debug("Connecting to Jellyfish controller at %s", url)
-            self._ws = await self._session.ws_connect(url, heartbeat=30)
+            ws = await asyncio.wait_for(
+                self._session.ws_connect(url, autoping=False), DEFAULT_CONNECT_TIMEOUT
+            )
+            if self._closing:
+                # disconnect() ran while the handshake was in flight.
+                await ws.close()
+                return
+            self._ws = ws
+            self._reconnect_attempts = 0
+            # Queues the pattern list and zones requests.
+            self.protocol.connection_made(time.monotonic())
+            self._outbox_event.set()
             self._connected_event.set()
             _LOGGER.info("Connected to Jellyfish controller %s", url)
             self._read_task = asyncio.create_task(self._read_loop())
+            self._heartbeat_task = asyncio.create_task(self._heartbeat_loop(self._ws))
         except Exception as exc:
             _LOGGER.warning("Failed to connect to %s: %s", url, exc)
             self._schedule_reconnect()
 
-    def _schedule_reconnect(self, delay: int = 5):
+    def _schedule_reconnect(self):
+        if self._closing:
+            return
         if self._reconnect_task and not self._reconnect_task.done():
             return
-        self._reconnect_task = asyncio.create_task(self._reconnect_loop(delay))
+        self._reconnect_task = asyncio.create_task(self._reconnect_loop())
 
-    async def _reconnect_loop(self, delay: int):
-        await asyncio.sleep(delay)
-        await self._connect_ws()
+    async def _reconnect_loop(self):
+        # Exponential backoff with jitter so a fleet of controllers coming back
+        # does not reconnect in lockstep.
+        while not self._closing and not self._connected_event.is_set():
+            delay = min(
+                RECONNECT_BACKOFF_MAX,
+                RECONNECT_BACKOFF_BASE * 2 ** self._reconnect_attempts,
+            )
+            self._reconnect_attempts += 1
+            await asyncio.sleep(random.uniform(delay / 2, delay))
+            await self._connect_ws()
 
     async def disconnect(self):
-        if self._read_task:
-            self._read_task.cancel()
+        self._closing = True
+        for task in (
+            self._reconnect_task, self._writer_task, self._read_task, self._heartbeat_task
+        ):
+            if task:
+                task.cancel()
+        self._reconnect_task = self._writer_task = self._read_task = None
+        self._heartbeat_task = None
         if self._ws:
             await self._ws.close()
             self._ws = None
-        if self._session:
+        if self._session and self._owns_session:
             await self._session.close()
             self._session = None
         self._connected_event.clear()
+        self._fail_pending(ConnectionError("Client disconnected"))
+        batches, self._run_batches = self._run_batches, {}
+        for _, fut, timer in batches.values():
+            timer.cancel()
+            self._settle(fut, False)
+        for fut in self.protocol.clear_outbox():
+            self._settle(fut, False)
 
     async def _read_loop(self):
         try:
@@ -81,76 +244,319 @@ class JellyfishClient:
                     continue
                 if msg.type == 1:  # text
                     await self._handle_message(msg.data)
+                elif msg.type == 9:  # ping
+                    await self._ws.pong(msg.data)
+                elif msg.type == 10:  # pong
+                    self.protocol.pong(time.monotonic())
         except asyncio.CancelledError:
             return
         except Exception as exc:
             _LOGGER.exception("Websocket read loop error: %s", exc)
         finally:
-            _LOGGER.warning("Websocket disconnected, scheduling reconnect")
             self._connected_event.clear()
-            self._schedule_reconnect()
+            if self._heartbeat_task:
+                self._heartbeat_task.cancel()
+                self._heartbeat_task = None
+            self._fail_pending(ConnectionError("Websocket disconnected"))
+            if not self._closing:
+                self.protocol.connection_lost(time.monotonic())
+                _LOGGER.warning("Websocket disconnected, scheduling reconnect")
+                self._schedule_reconnect()
+
+    async def _heartbeat_loop(self, ws: ClientWebSocketResponse):
+        # Our own ping rather than aiohttp's heartbeat, so the round trip can
+        # be measured. A ping still unanswered a full interval later closes
+        # the connection, which schedules the reconnect.
+        while not ws.closed:
+            await asyncio.sleep(HEARTBEAT_INTERVAL)
+            if not self.protocol.ping(time.monotonic()):
+                _LOGGER.warning("No pong from %s in %ss, reconnecting", self.host, HEARTBEAT_INTERVAL)
+                await ws.close()
+                return
+            await ws.ping()
 
     async def _handle_message(self, raw: str):
+        # Messages are awaited one at a time by the read loop, so offloaded
+        # ones are still applied in order.
+        protocol = self.protocol
+        if not protocol.needs_offload(raw):
+            self._dispatch(protocol.receive(raw, time.monotonic()))
+            return
+        start = time.perf_counter()
         try:
-            payload = json.loads(raw)
+            payload, catalog = await self.hass.async_add_executor_job(
+                protocol.decode_offloaded, raw, protocol.catalog.version + 1
+            )
         except Exception:
-            _LOGGER.debug("Non-JSON from controller: %s", raw)
+            protocol.receive_decoded(raw, None, 0.0, time.monotonic())
+            _LOGGER.debug("Non-JSON from controller: %s", raw[:256])
             return
+        self._dispatch(
+            protocol.receive_decoded(
+                raw, payload, time.perf_counter() - start, time.monotonic(), catalog, True
+            )
+        )
 
-        cmd = payload.get("cmd")
-        if cmd == "fromCtlr":
-            if "patternFileList" in payload:
-                self._patterns = payload["patternFileList"]
-                async_dispatcher_send(self.hass, f"{DOMAIN}_patterns_updated")
-            if "zones" in payload:
-                self._zones = payload["zones"]
-                async_dispatcher_send(self.hass, f"{DOMAIN}_zones_updated")
-
-    async def _send(self, payload: Dict[str, Any]):
-        await self._connected_event.wait()
-        if not self._ws:
-            _LOGGER.error("Websocket not connected")
-            return
-        try:
-            await self._ws.send_str(json.dumps(payload))
-        except Exception as exc:
-            _LOGGER.exception("Failed to send payload: %s", exc)
+    # Listeners receive (client, Delta) or (client, zones) so each entity can
+    # tell whether its own view changed.
+    @callback
+    def _dispatch(self, events: List[Any]):
+        for event in events:
+            kind = type(event)
+            if kind is Reply:
+                fut = self._pending.pop(event.key, None)
+                if fut is not None and not fut.done():
+                    fut.set_result(event.value)
+            elif kind is ZoneStatesUpdated:
+                async_dispatcher_send(self.hass, SIGNAL_ZONE_STATE_UPDATED, self, event.zones)
+            elif kind is ZonesUpdated:
+                self._save_snapshot()
+                async_dispatcher_send(self.hass, SIGNAL_ZONES_UPDATED, self, event.delta)
+            elif kind is PatternsUpdated:
+                if self.pattern_cache is not None:
+                    self.pattern_cache.invalidate(self.catalog.signatures)
+                self._save_snapshot()
+                if event.delta or event.folders_changed:
+                    async_dispatcher_send(self.hass, SIGNAL_PATTERNS_UPDATED, self, event.delta)
+        # Handlers may have queued follow-up requests.
+        if self.protocol.queue_stats["depth"]:
+            self._outbox_event.set()
+
+    @staticmethod
+    def _settle(fut: Optional[asyncio.Future], result: bool):
+        if fut is not None and not fut.done():
+            fut.set_result(result)
+
+    def _fail_pending(self, exc: Exception):
+        pending, self._pending = self._pending, {}
+        for key, fut in pending.items():
+            self._settle(self.protocol.discard((GET,) + key), False)
+            if not fut.done():
+                fut.set_exception(exc)
+
+    def _expire_request(self, key: tuple, fut: asyncio.Future):
+        if self._pending.get(key) is fut:
+            del self._pending[key]
+            # Nobody is waiting for the reply any more; do not send it later.
+            self._settle(self.protocol.discard((GET,) + key), False)
+        if not fut.done():
+            fut.set_exception(asyncio.TimeoutError(f"No reply from controller for {key}"))
+
+    async def _request(self, item: List[Any], timeout: float = DEFAULT_REQUEST_TIMEOUT):
+        # Send a toCtlrGet and wait for the matching fromCtlr reply.
+        key = tuple(item)
+        fut = self._pending.get(key)
+        if fut is None:
+            loop = asyncio.get_running_loop()
+            fut = loop.create_future()
+            # Waiters may all be cancelled before the reply or deadline arrives;
+            # mark the outcome as retrieved so asyncio does not log it.
+            fut.add_done_callback(lambda f: f.cancelled() or f.exception())
+            self._pending[key] = fut
+            expire = loop.call_later(timeout, self._expire_request, key, fut)
+            fut.add_done_callback(lambda _: expire.cancel())
+            self._enqueue(*self.protocol.get_frame(item))
+        # Shield so one cancelled caller does not cancel the shared future.
+        return await asyncio.shield(fut)
+
+    def _enqueue(
+        self,
+        frame: str,
+        key: Optional[Hashable] = None,
+        fut: Optional[asyncio.Future] = None,
+    ) -> asyncio.Future:
+        # Queue a frame for the writer. The returned future resolves to True
+        # once the frame is written, or False if it was superseded or dropped.
+        if fut is None:
+            fut = asyncio.get_running_loop().create_future()
+        for displaced in self.protocol.queue(frame, key, fut, time.monotonic()):
+            self._settle(displaced, False)
+        self._outbox_event.set()
+        return fut
+
+    async def _send(self, frame: str, key: Optional[Hashable] = None) -> bool:
+        fut = self._enqueue(frame, key)
+        await self._wait_written(fut)
+        return fut.done() and fut.result()
+
+    async def _wait_written(self, fut: asyncio.Future, window: float = 0.0):
+        # Wait out the batching window and then the write, but never a
+        # reconnect: a frame queued while the link is down is sent once it
+        # is back, and light.turn_on or an automation should not hang on it
+        # meanwhile. asyncio.wait neither raises nor cancels the shared future.
+        wait = window + (DEFAULT_WRITE_WAIT if self.connected else 0)
+        await asyncio.wait({fut}, timeout=wait)
+
+    async def _writer_loop(self):
+        protocol = self.protocol
+        while True:
+            if not protocol.queue_stats["depth"]:
+                self._outbox_event.clear()
+                await self._outbox_event.wait()
+                continue
+            await self._connected_event.wait()
+            key, frame, fut, queued = protocol.pop_frame()
+            if fut is not None and fut.done():
+                continue
+            try:
+                await self._ws.send_str(frame)
+            except asyncio.CancelledError:
+                self._settle(fut, False)
+                raise
+            except Exception as exc:
+                _LOGGER.warning("Failed to send frame to %s: %s", self.host, exc)
+                # Keep the frame for the next connection unless it has been
+                # superseded meanwhile; the read loop handles the reconnect.
+                protocol.requeue(key, frame, fut, queued)
+                self._connected_event.clear()
+                if self._ws is not None:
+                    await self._ws.close()
+            else:
+                protocol.frame_written(key, frame, queued, time.monotonic())
+                self._settle(fut, True)
 
     # Convenience methods:
     async def request_pattern_list(self):
-        await self._send({"cmd": "toCtlrGet", "get": [["patternFileList"]]})
+        await self._send(*self.protocol.get_frame(["patternFileList"]))
 
     async def request_zones(self):
-        await self._send({"cmd": "toCtlrGet", "get": [["zones"]]})
-
-    async def run_pattern(self, file: str, zone_names: List[str], state: int = 1):
-        payload = {
-            "cmd": "toCtlrSet",
-            "runPattern": {
-                "file": file,
-                "data": "",
-                "id": "",
-                "state": state,
-                "zoneName": zone_names
-            }
-        }
-        await self._send(payload)
-
-    async def run_pattern_advanced(self, data: str, zone_names: List[str], state: int = 1):
-        payload = {
-            "cmd": "toCtlrSet",
-            "runPattern": {
-                "file": "",
-                "data": data,
-                "id": "",
-                "state": state,
-                "zoneName": zone_names
-            }
-        }
-        await self._send(payload)
-
-    async def get_pattern_file_data(self, folder: str, filename: str):
-        payload = {"cmd": "toCtlrGet", "get": [["patternFileData", folder, filename]]}
-        await self._send(payload)
-        # Not waiting for response here; controller will send fromCtlr containing patternFileData
-        return True
+        await self._send(*self.protocol.get_frame(["zones"]))
+
+    async def run_pattern(
+        self, file: str, zone_names: List[str], state: int = 1, force: bool = False
+    ):
+        await self._run_pattern(file, "", state, zone_names, force)
+
+    async def run_pattern_advanced(
+        self,
+        data: Union[Pattern, str, Mapping[str, Any]],
+        zone_names: List[str],
+        state: int = 1,
+        force: bool = False,
+    ):
+        # Raises InvalidPattern before anything is queued. Known patterns and
+        # JSON strings resolve to their cached, already serialized form.
+        await self._run_pattern("", pattern.coerce(data).json, state, zone_names, force)
+
+    @callback
+    def async_add_command_listener(
+        self, listener: Callable[[List[str]], None]
+    ) -> Callable[[], None]:
+        self._command_listeners.append(listener)
+        return lambda: self._command_listeners.remove(listener)
+
+    def _notify_command(self, zone_names: List[str]):
+        for listener in list(self._command_listeners):
+            listener(zone_names)
+
+    def send_frame(self, data: str, zone_names: List[str]) -> asyncio.Future:
+        # One animation frame: no batching window, no duplicate suppression.
+        # An unsent frame for the same zones is replaced by the newer one.
+        zone_names = self.protocol.filter_run_pattern("", data, 1, zone_names, force=True)
+        self._withdraw_from_batches(zone_names)
+        return self._enqueue(*self.protocol.run_pattern_frame("", data, 1, zone_names))
+
+    def _confirm(self, zones: List[str], zone_state: ZoneState, fut: asyncio.Future):
+        if not fut.cancelled() and fut.exception() is None and fut.result():
+            self._dispatch(self.protocol.run_pattern_written(zones, zone_state, time.monotonic()))
+
+    async def _run_pattern(
+        self, file: str, data: str, state: int, zone_names: List[str], force: bool = False
+    ):
+        # Before filtering: a command matching the current state still ends
+        # a transition that would otherwise move the zone on.
+        self._notify_command(zone_names)
+        zone_names = self.protocol.filter_run_pattern(file, data, state, zone_names, force)
+        if not zone_names:
+            return
+        if self.batch_window <= 0:
+            await self._wait_written(self._send_run_pattern(file, data, state, zone_names))
+            return
+        # Merge identical runPattern calls that arrive within the batching
+        # window into one frame with a combined zoneName list.
+        key = (file, data, state)
+        batch = self._run_batches.get(key)
+        if batch is None:
+            loop = asyncio.get_running_loop()
+            fut = loop.create_future()
+            fut.add_done_callback(lambda f: f.cancelled() or f.exception())
+            batch = ({}, fut, loop.call_later(self.batch_window, self._flush_run_batch, key))
+            self._run_batches[key] = batch
+        # The newest command for a zone wins: an older batch flushed after it
+        # would otherwise undo it.
+        self._withdraw_from_batches(zone_names, keep=key)
+        zones, fut, _ = batch
+        zones.update(dict.fromkeys(zone_names))
+        await self._wait_written(fut, self.batch_window)
+
+    def _withdraw_from_batches(self, zone_names: List[str], keep: Optional[tuple] = None):
+        # Take the zones out of every open batch but `keep`. A batch left
+        # with no zones is dropped and its callers resolve as superseded.
+        for key, (zones, fut, timer) in list(self._run_batches.items()):
+            if key == keep:
+                continue
+            for zone in zone_names:
+                zones.pop(zone, None)
+            if not zones:
+                del self._run_batches[key]
+                timer.cancel()
+                self._settle(fut, False)
+
+    def _flush_run_batch(self, key: tuple):
+        zones, fut, _ = self._run_batches.pop(key)
+        self._send_run_pattern(*key, list(zones), fut)
+
+    def _send_run_pattern(
+        self,
+        file: str,
+        data: str,
+        state: int,
+        zone_names: List[str],
+        fut: Optional[asyncio.Future] = None,
+    ) -> asyncio.Future:
+        fut = self._enqueue(*self.protocol.run_pattern_frame(file, data, state, zone_names), fut)
+        fut.add_done_callback(
+            lambda f: self._confirm(zone_names, ZoneState(file, data, state), f)
+        )
+        return fut
+
+    async def apply_zone_states(self, zone_states: Mapping[str, ZoneState], force: bool = False):
+        # Zones sharing a state go out as one runPattern frame, and every
+        # frame is queued before any is awaited, so restoring a whole
+        # controller costs one burst of writes rather than a call per zone.
+        self._notify_command(list(zone_states))
+        groups: Dict[StateKey, List[str]] = {}
+        for zone, zone_state in zone_states.items():
+            groups.setdefault(state_key(*zone_state), []).append(zone)
+        futures = []
+        for (file, data, state), zone_names in groups.items():
+            zone_names = self.protocol.filter_run_pattern(file, data, state, zone_names, force)
+            if zone_names:
+                # Queued directly, so older calls still in the batching
+                # window must not follow and undo it.
+                self._withdraw_from_batches(zone_names)
+                futures.append(self._send_run_pattern(file, data, state, zone_names))
+        if futures:
+            await self._wait_written(asyncio.gather(*futures))
+
+    async def get_pattern_file_data(
+        self,
+        folder: str,
+        filename: str,
+        timeout: float = DEFAULT_REQUEST_TIMEOUT,
+        cache_result: bool = True,
+        refresh: bool = False,
+    ) -> Dict[str, Any]:
+        # Bulk readers (e.g. the library mirror) pass cache_result=False so
+        # they do not flush the patterns entities actually use from the LRU.
+        # refresh=True skips the cached copy, which may predate an edit of
+        # the file's content (see PatternDataCache), and stores the new one.
+        cache = self.pattern_cache
+        if cache is not None and not refresh:
+            cached = cache.get(folder, filename)
+            if cached is not None:
+                return cached
+        data = await self._request(["patternFileData", folder, filename], timeout)
+        if cache is not None and cache_result:
+            cache.put(folder, filename, data, self.catalog.signatures.get((folder, filename)))
+        return data
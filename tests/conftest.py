@@ -0,0 +1,220 @@
+import asyncio
+import inspect
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+# Import the integration as custom_components.jellyfish_lighting, the way
+# Home Assistant loads it.
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+try:
+    from aiohttp import WSMsgType, web
+    from homeassistant.core import HomeAssistant
+except ImportError:  # pragma: no cover
+    # Pure-function tests still run; the fixtures below need Home Assistant.
+    HomeAssistant = None
+
+# Batching window used by test clients: long enough to merge calls made in
+# one go, short enough to keep tests fast.
+WINDOW = 0.05
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_pyfunc_call(pyfuncitem):
+    # Run `async def` tests on the `loop` fixture's event loop.
+    if not inspect.iscoroutinefunction(pyfuncitem.obj):
+        return None
+    args = {name: pyfuncitem.funcargs[name] for name in pyfuncitem._fixtureinfo.argnames}
+    pyfuncitem.funcargs["loop"].run_until_complete(pyfuncitem.obj(**args))
+    return True
+
+
+def pytest_collection_modifyitems(items):
+    # Every async test needs the loop, even if it does not ask for it.
+    for item in items:
+        if inspect.iscoroutinefunction(getattr(item, "obj", None)):
+            item.fixturenames.insert(0, "loop")
+
+
+class FakeController:
+    # Minimal controller: answers toCtlrGet from `zones`, `patterns` and
+    # `files` (keyed by (folder, name)), echoes toCtlrSet runPattern like
+    # the real one, and records every frame it receives.
+    def __init__(self):
+        self.zones = {"A": {"numPixels": 10}, "B": {"numPixels": 10}}
+        self.patterns = [
+            {"folders": "F", "name": "", "readOnly": False},
+            {"folders": "F", "name": "X", "readOnly": False},
+        ]
+        self.files = {}
+        self.received = []
+        self.file_gets = 0
+        self.port = None
+        self._sockets = set()
+        self._runner = None
+
+    @property
+    def run_patterns(self):
+        # (file, state, zones) of every runPattern set received, in order.
+        return [
+            (run["file"], run["state"], run["zoneName"])
+            for run in (frame.get("runPattern") for frame in self.received)
+            if run is not None
+        ]
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_get("/", self._handle)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        await self.drop()
+        await self._runner.cleanup()
+
+    async def drop(self):
+        # Close every client connection, as a controller reboot would.
+        for ws in list(self._sockets):
+            await ws.close()
+
+    async def _handle(self, request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        self._sockets.add(ws)
+        try:
+            async for msg in ws:
+                if msg.type == WSMsgType.TEXT:
+                    await self._receive(ws, json.loads(msg.data))
+        finally:
+            self._sockets.discard(ws)
+        return ws
+
+    async def _receive(self, ws, frame):
+        self.received.append(frame)
+        for item in frame.get("get") or ():
+            if item[0] == "zones":
+                await self._send(ws, zones=self.zones)
+            elif item[0] == "patternFileList":
+                await self._send(ws, patternFileList=self.patterns)
+            elif item[0] == "patternFileData" and (item[1], item[2]) in self.files:
+                self.file_gets += 1
+                await self._send(ws, patternFileData=self.files[(item[1], item[2])])
+        if frame.get("runPattern"):
+            await self._send(ws, runPattern=frame["runPattern"])
+
+    async def runs(self, count):
+        # Wait for `count` runPattern sets, then a little longer so any
+        # unexpected extra frame shows up in the result too.
+        await wait_until(lambda: len(self.run_patterns) >= count)
+        await asyncio.sleep(WINDOW * 2)
+        return self.run_patterns
+
+    @staticmethod
+    async def _send(ws, **payload):
+        await ws.send_str(json.dumps({"cmd": "fromCtlr", **payload}))
+
+
+async def wait_until(predicate, timeout=3.0):
+    # Poll until predicate() is true; fails the test on timeout.
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not predicate():
+        if asyncio.get_running_loop().time() > deadline:
+            raise AssertionError("condition not met in time")
+        await asyncio.sleep(0.01)
+
+
+@pytest.fixture
+def loop():
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    yield loop
+    loop.run_until_complete(loop.shutdown_asyncgens())
+    loop.close()
+    asyncio.set_event_loop(None)
+
+
+@pytest.fixture(name="wait_until")
+def wait_until_fixture():
+    return wait_until
+
+
+@pytest.fixture
+def hass(loop, tmp_path):
+    if HomeAssistant is None:
+        pytest.skip("Home Assistant is not installed")
+
+    async def create():
+        return HomeAssistant(str(tmp_path))
+
+    hass = loop.run_until_complete(create())
+    yield hass
+    loop.run_until_complete(hass.async_stop(force=True))
+
+
+@pytest.fixture
+def controller(loop, hass):
+    controller = FakeController()
+    loop.run_until_complete(controller.start())
+    yield controller
+    loop.run_until_complete(controller.stop())
+
+
+@pytest.fixture
+def connect_client(loop, hass, controller):
+    # Factory: a JellyfishClient connected to the fake controller, with its
+    # zones and pattern list loaded. Keyword arguments go to the client.
+    from custom_components.jellyfish_lighting.websocket_api import JellyfishClient
+
+    clients = []
+
+    async def connect(**kwargs):
+        kwargs.setdefault("batch_window", WINDOW)
+        client = JellyfishClient(hass, "127.0.0.1", controller.port, **kwargs)
+        clients.append(client)
+        await client.connect()
+        await wait_until(lambda: client.zones and client.catalog.names)
+        return client
+
+    yield connect
+    for client in clients:
+        loop.run_until_complete(client.disconnect())
+
+
+@pytest.fixture
+def setup_services(loop, hass, controller, wait_until):
+    # The integration's domain data with one controller, wired the way
+    # async_setup_entry does it.
+    from custom_components.jellyfish_lighting.const import (
+        DATA_HUB,
+        DATA_SCENES,
+        DATA_ZONE_REGISTRY,
+        DOMAIN,
+    )
+    from custom_components.jellyfish_lighting.hub import JellyfishHub
+    from custom_components.jellyfish_lighting.registry import ZoneRegistry
+    from custom_components.jellyfish_lighting.scenes import SceneStore
+    from custom_components.jellyfish_lighting.services import async_setup_services
+
+    registry = ZoneRegistry()
+    hub = JellyfishHub(hass, registry)
+    scenes = SceneStore(hass)
+    loop.run_until_complete(scenes.async_load())
+    hass.data[DOMAIN] = {DATA_ZONE_REGISTRY: registry, DATA_HUB: hub, DATA_SCENES: scenes}
+    async_setup_services(hass)
+
+    async def add_controller():
+        # Connects the fake controller through the hub; returns its client.
+        client = hub.async_create_client("test", "127.0.0.1", controller.port, batch_window=WINDOW)
+        hub.async_start("test")
+        await wait_until(lambda: client.zones)
+        registry.async_update_client(client)
+        return client
+
+    yield add_controller
+    loop.run_until_complete(hub.async_shutdown())
@@ -0,0 +1,43 @@
+import asyncio
+import json
+
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from custom_components.jellyfish_lighting import pixels  # noqa: E402
+from custom_components.jellyfish_lighting.animation import AnimationScheduler, fade  # noqa: E402
+
+
+def brightness(data):
+    return json.loads(data)["runData"]["brightness"]
+
+
+async def test_fade_ends_on_the_last_frame(connect_client, controller):
+    client = await connect_client()
+    scheduler = AnimationScheduler(client, fps=20)
+
+    assert await scheduler.animate(["A"], fade(pixels.color_pattern((255, 0, 0)), 0, 100), 0.2)
+    await controller.runs(1)
+    last = [frame["runPattern"] for frame in controller.received if "runPattern" in frame][-1]
+    assert brightness(last["data"]) == 100
+
+
+async def test_command_interrupts_fade(connect_client, controller, wait_until):
+    client = await connect_client()
+    scheduler = AnimationScheduler(client, fps=20)
+    fading = asyncio.create_task(
+        scheduler.animate(["A"], fade(pixels.color_pattern((255, 0, 0)), 0, 100), 0.5)
+    )
+    await asyncio.sleep(0.2)
+    await client.run_pattern("", ["A"], 0)
+
+    assert await fading is False
+    assert not scheduler.is_animating("A")
+    await wait_until(lambda: ("", 0, ["A"]) in controller.run_patterns)
+    await asyncio.sleep(0.5)
+    runs = controller.run_patterns
+    # Frames went out before the off, none after it.
+    assert runs[0] == ("", 1, ["A"])
+    assert runs[-1] == ("", 0, ["A"])
+    assert client.zone_states["A"].state == 0
@@ -0,0 +1,82 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from custom_components.jellyfish_lighting.cache import PatternDataCache  # noqa: E402
+from custom_components.jellyfish_lighting.models import ZoneState  # noqa: E402
+
+
+async def test_batch_merges_zones(connect_client, controller):
+    client = await connect_client()
+    await asyncio.gather(client.run_pattern("F/X", ["A"]), client.run_pattern("F/X", ["B"]))
+
+    assert await controller.runs(1) == [("F/X", 1, ["A", "B"])]
+
+
+async def test_on_off_on_within_window_ends_on(connect_client, controller):
+    client = await connect_client()
+    await asyncio.gather(
+        client.run_pattern("F/X", ["B"]),
+        client.run_pattern("", ["B"], 0),
+        client.run_pattern("F/X", ["B"]),
+    )
+
+    assert (await controller.runs(1))[-1] == ("F/X", 1, ["B"])
+
+
+async def test_newer_batch_takes_zone_from_older_one(connect_client, controller):
+    client = await connect_client()
+    await asyncio.gather(
+        client.run_pattern("F/X", ["A", "B"]), client.run_pattern("", ["B"], 0)
+    )
+
+    assert await controller.runs(2) == [("F/X", 1, ["A"]), ("", 0, ["B"])]
+
+
+async def test_scene_restore_overtakes_batched_call(connect_client, controller):
+    client = await connect_client()
+    pending = asyncio.create_task(client.run_pattern("F/X", ["B"]))
+    await asyncio.sleep(0)
+    await client.apply_zone_states({"B": ZoneState("", "", 0)})
+    await pending
+
+    assert await controller.runs(1) == [("", 0, ["B"])]
+
+
+async def test_animation_frame_overtakes_batched_call(connect_client, controller):
+    client = await connect_client()
+    pending = asyncio.create_task(client.run_pattern("F/X", ["A", "B"]))
+    await asyncio.sleep(0)
+    await client.send_frame('{"frame": 1}', ["B"])
+    await pending
+
+    assert await controller.runs(2) == [("", 1, ["B"]), ("F/X", 1, ["A"])]
+
+
+async def test_refresh_bypasses_pattern_cache(hass, connect_client, controller):
+    controller.files[("F", "X")] = {"folders": "F", "name": "X", "jsonData": "new"}
+    cache = PatternDataCache(hass, "test")
+    client = await connect_client(pattern_cache=cache)
+    old = {"folders": "F", "name": "X", "jsonData": "old"}
+    cache.put("F", "X", old, client.catalog.signatures[("F", "X")])
+
+    assert (await client.get_pattern_file_data("F", "X"))["jsonData"] == "old"
+    assert (await client.get_pattern_file_data("F", "X", refresh=True))["jsonData"] == "new"
+    assert (await client.get_pattern_file_data("F", "X"))["jsonData"] == "new"
+    assert controller.file_gets == 1
+
+
+async def test_commands_do_not_wait_for_reconnect(connect_client, controller, wait_until):
+    client = await connect_client()
+    await controller.drop()
+    await wait_until(lambda: not client.connected)
+
+    await asyncio.wait_for(client.run_pattern("F/X", ["A"]), 1)
+    await asyncio.wait_for(client.apply_zone_states({"B": ZoneState("", "", 0)}), 1)
+    assert client.queue_stats["depth"] == 2
+    assert controller.run_patterns == []
+
+    # Still sent once the client has reconnected on its own.
+    assert await controller.runs(2) == [("F/X", 1, ["A"]), ("", 0, ["B"])]
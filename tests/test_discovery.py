@@ -0,0 +1,51 @@
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from custom_components.jellyfish_lighting.discovery import parse_hosts  # noqa: E402
+
+
+def test_parse_hosts_keeps_order_and_drops_duplicates():
+    assert parse_hosts(" roof.local, 10.0.0.5\n10.0.0.5  jf-garage ") == [
+        "roof.local", "10.0.0.5", "jf-garage"
+    ]
+
+
+def test_parse_hosts_expands_networks_without_network_and_broadcast():
+    hosts = parse_hosts("192.168.1.0/24")
+    assert len(hosts) == 254
+    assert (hosts[0], hosts[-1]) == ("192.168.1.1", "192.168.1.254")
+    assert parse_hosts("10.0.0.7/32") == ["10.0.0.7"]
+
+
+@pytest.mark.parametrize("text", ["10.0.0.10-12", "10.0.0.10-10.0.0.12"])
+def test_parse_hosts_expands_ranges(text):
+    assert parse_hosts(text) == ["10.0.0.10", "10.0.0.11", "10.0.0.12"]
+
+
+@pytest.mark.parametrize(
+    "text",
+    ["10.0.0.0/33", "10.0.0.20-10", "10.0.0.1-fe80::1", "10.0.0.1-x", "10.0.0.1-300"],
+)
+def test_parse_hosts_rejects_bad_networks_and_ranges(text):
+    with pytest.raises(ValueError):
+        parse_hosts(text)
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "10.0.0.0/27",
+        "10.0.0.1-17",
+        "10.0.0.0/29 10.0.1.0/29 10.0.2.0/29",
+        " ".join(f"host{i}" for i in range(17)),
+    ],
+)
+def test_parse_hosts_limits_the_number_of_hosts(text):
+    with pytest.raises(ValueError):
+        parse_hosts(text, max_hosts=16)
+
+
+def test_parse_hosts_accepts_exactly_max_hosts():
+    assert len(parse_hosts("10.0.0.0/28", max_hosts=14)) == 14
+    assert len(parse_hosts("10.0.0.1-16", max_hosts=16)) == 16
@@ -0,0 +1,42 @@
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from custom_components.jellyfish_lighting.cache import PatternDataCache  # noqa: E402
+from custom_components.jellyfish_lighting.mirror import PatternMirror, read_pattern  # noqa: E402
+
+
+def pattern(name, content):
+    return {"folders": "F", "name": name, "jsonData": content}
+
+
+async def test_mirror_fetches_only_changes_unless_refreshed(hass, connect_client, controller):
+    controller.patterns = [
+        {"folders": "F", "name": "", "readOnly": False},
+        {"folders": "F", "name": "A", "readOnly": False},
+        {"folders": "F", "name": "B", "readOnly": False},
+    ]
+    controller.files = {("F", "A"): pattern("A", "a1"), ("F", "B"): pattern("B", "b1")}
+    cache = PatternDataCache(hass, "test")
+    client = await connect_client(pattern_cache=cache)
+    cache.put("F", "A", pattern("A", "stale"), client.catalog.signatures[("F", "A")])
+    mirror = PatternMirror(hass, client)
+
+    first = await mirror.async_mirror()
+    assert (first["files"], first["fetched"]) == (2, 2)
+    # Straight from the controller, without reading or filling the cache.
+    assert read_pattern(mirror.path, "F", "A")["jsonData"] == "a1"
+    assert cache.stats["entries"] == 1
+    assert (cache.hits, cache.misses) == (0, 0)
+
+    again = await mirror.async_mirror()
+    assert again["fetched"] == 0
+
+    # A content edit leaves the listing unchanged.
+    controller.files[("F", "B")] = pattern("B", "b2")
+    assert (await mirror.async_mirror())["fetched"] == 0
+    assert read_pattern(mirror.path, "F", "B")["jsonData"] == "b1"
+    refreshed = await mirror.async_mirror(refresh=True)
+    assert refreshed["fetched"] == 2
+    assert read_pattern(mirror.path, "F", "B")["jsonData"] == "b2"
+    assert controller.file_gets == 4
@@ -0,0 +1,36 @@
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from custom_components.jellyfish_lighting import pattern  # noqa: E402
+from custom_components.jellyfish_lighting.pattern import InvalidPattern  # noqa: E402
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        [],
+        "colors",
+        {},
+        {"colors": [255, 0]},
+        {"colors": [256, 0, 0]},
+        {"colors": [1.5, 0, 0]},
+        {"colors": [True, 0, 0]},
+        {"colors": 5},
+        {"colors": [255, 0, 0], "runData": []},
+        {"colors": [255, 0, 0], "runData": {"brightness": 101}},
+        {"colors": [255, 0, 0], "runData": {"speed": "fast"}},
+        {"colors": [255, 0, 0], "runData": {"rgbAdj": [100, 100]}},
+        {"colors": [255, 0, 0], "skip": -1},
+        {"colors": [255, 0, 0], "type": ""},
+    ],
+)
+def test_from_dict_rejects_invalid_patterns(data):
+    with pytest.raises(InvalidPattern):
+        pattern.from_dict(data)
+
+
+def test_from_dict_keeps_unknown_keys():
+    loaded = pattern.from_dict({"colors": [255, 0, 0], "custom": 1})
+    assert loaded.as_dict()["custom"] == 1
+    assert pattern.from_json(loaded.json) == loaded
@@ -0,0 +1,47 @@
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from custom_components.jellyfish_lighting import pixels  # noqa: E402
+
+STOPS = ((255, 0, 0), (0, 128, 255), (10, 20, 30))
+
+
+@pytest.mark.parametrize("count", [2, 3, 7, 150])
+def test_gradient_starts_and_ends_on_the_outer_stops(count):
+    buffer = pixels.gradient(STOPS, count)
+    assert len(buffer) == 3 * count
+    assert tuple(buffer[:3]) == STOPS[0]
+    assert tuple(buffer[-3:]) == STOPS[-1]
+
+
+def test_gradient_passes_through_middle_stop():
+    assert tuple(pixels.gradient(STOPS, 5)[6:9]) == STOPS[1]
+
+
+def test_gradient_edge_cases():
+    assert pixels.gradient(STOPS, 0) == b""
+    assert pixels.gradient(((1, 2, 3),), 4) == bytes((1, 2, 3)) * 4
+    assert pixels.gradient(STOPS, 1) == bytes(STOPS[0])
+
+
+@pytest.mark.parametrize(
+    "stops, count",
+    [
+        (STOPS, 150),
+        (((0, 0, 0), (255, 255, 255)), 256),
+        (((0, 0, 0), (255, 255, 255)), 7),
+        (((200, 100, 0), (0, 100, 200), (50, 50, 50), (255, 0, 255)), 3),
+        (((200, 100, 0), (0, 100, 200), (50, 50, 50), (255, 0, 255)), 61),
+    ],
+)
+def test_numpy_and_pure_python_gradients_agree(stops, count):
+    if pixels.np is None:
+        pytest.skip("NumPy is not installed")
+    assert pixels._gradient_array(stops, count) == pixels._gradient_numpy(stops, count)
+
+
+def test_gradient_span_splits_one_gradient():
+    spans = pixels.gradient_span(STOPS, (3, 0, 5))
+    assert [len(span) for span in spans] == [9, 0, 15]
+    assert b"".join(spans) == pixels.gradient(STOPS, 8)
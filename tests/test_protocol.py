@@ -0,0 +1,184 @@
+import json
+
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from custom_components.jellyfish_lighting.models import ZoneState  # noqa: E402
+from custom_components.jellyfish_lighting.protocol import (  # noqa: E402
+    GET,
+    JellyfishProtocol,
+    PatternsUpdated,
+    Reply,
+    ZonesUpdated,
+    ZoneStatesUpdated,
+)
+
+ON = ZoneState("F/X", "", 1)
+OTHER = ZoneState("F/Y", "", 1)
+
+
+class FakeTimer:
+    def __init__(self, step):
+        self.now = 0.0
+        self.step = step
+
+    def __call__(self):
+        self.now += self.step
+        return self.now
+
+
+def frame(**payload):
+    return json.dumps({"cmd": "fromCtlr", **payload})
+
+
+def echo(zone_state, *zones):
+    file, data, state = zone_state
+    return frame(runPattern={"file": file, "data": data, "state": state, "zoneName": list(zones)})
+
+
+def drain(protocol):
+    frames = []
+    while True:
+        item = protocol.pop_frame()
+        if item is None:
+            return frames
+        frames.append(json.loads(item[1]))
+
+
+def test_connection_made_queues_initial_gets():
+    protocol = JellyfishProtocol()
+    protocol.connection_made(0.0)
+    assert [f["get"] for f in drain(protocol)] == [[["patternFileList"]], [["zones"]]]
+
+
+def test_downtime_uses_the_times_passed_in():
+    protocol = JellyfishProtocol()
+    protocol.connection_made(10.0)
+    protocol.connection_lost(20.0)
+    assert protocol.metrics.current_downtime(25.0) == 5.0
+    protocol.connection_made(32.0)
+    metrics = protocol.metrics
+    assert (metrics.connects, metrics.reconnects, metrics.downtime) == (2, 1, 12.0)
+    assert metrics.as_dict(100.0)["downtime_s"] == 12.0
+
+
+def test_decode_timing_uses_injected_timer():
+    protocol = JellyfishProtocol(timer=FakeTimer(0.25))
+    protocol.receive(frame(zones={}), 0.0)
+    assert protocol.decode_stats["zones"]["total_ms"] == 250.0
+
+
+def test_zones_reply_updates_and_asks_for_zone_states():
+    protocol = JellyfishProtocol()
+    events = protocol.receive(frame(zones={"A": {}, "B": {}}), 1.0)
+    assert ZonesUpdated in {type(event) for event in events}
+    assert Reply(("zones",), {"A": {}, "B": {}}) in events
+    assert drain(protocol)[0]["get"] == [["runPattern", "A"], ["runPattern", "B"]]
+    # The same zones again change nothing.
+    events = protocol.receive(frame(zones={"A": {}, "B": {}}), 2.0)
+    assert [type(event) for event in events] == [Reply]
+
+
+def test_pattern_list_reports_delta():
+    protocol = JellyfishProtocol()
+    listing = [{"folders": "F", "name": "X", "readOnly": False}]
+    events = protocol.receive(frame(patternFileList=listing), 1.0)
+    update = next(event for event in events if type(event) is PatternsUpdated)
+    assert update.delta.added == {("F", "X")}
+    assert protocol.catalog.file_for("X") == "F/X"
+
+
+def test_latest_wins_in_outbox():
+    protocol = JellyfishProtocol()
+    frame_a, key = protocol.run_pattern_frame("F/X", "", 1, ["Z"])
+    frame_b, _ = protocol.run_pattern_frame("F/Y", "", 1, ["Z"])
+    assert protocol.queue(frame_a, key, "a") == []
+    assert protocol.queue(frame_b, key, "b") == ["a"]
+    assert [f["runPattern"]["file"] for f in drain(protocol)] == ["F/Y"]
+
+
+def test_written_state_suppresses_repeat():
+    protocol = JellyfishProtocol()
+    assert protocol.filter_run_pattern(*ON, ["Z"]) == ["Z"]
+    events = protocol.run_pattern_written(["Z"], ON, 1.0)
+    assert events == [ZoneStatesUpdated(frozenset({"Z"}))]
+    assert protocol.filter_run_pattern(*ON, ["Z"]) == []
+    assert protocol.queue_stats["suppressed"] == 1
+
+
+def test_stale_echo_does_not_confirm_older_write():
+    # Two writes in a row; the first one's echo arrives after the second
+    # write. It must not be taken as the zone's confirmed state.
+    protocol = JellyfishProtocol()
+    protocol.filter_run_pattern(*ON, ["Z"])
+    protocol.run_pattern_written(["Z"], ON, 1.0)
+    protocol.filter_run_pattern(*OTHER, ["Z"])
+    protocol.run_pattern_written(["Z"], OTHER, 2.0)
+    protocol.receive(echo(ON, "Z"), 3.0)
+    # The final state is unknown: neither command may be suppressed.
+    assert protocol.filter_run_pattern(*ON, ["Z"]) == ["Z"]
+    protocol.run_pattern_written(["Z"], ON, 4.0)
+    protocol.receive(echo(OTHER, "Z"), 5.0)
+    assert protocol.filter_run_pattern(*ON, ["Z"]) == ["Z"]
+    # The echo of the latest write confirms it.
+    protocol.run_pattern_written(["Z"], ON, 6.0)
+    protocol.receive(echo(ON, "Z"), 7.0)
+    assert protocol.filter_run_pattern(*ON, ["Z"]) == []
+    assert protocol.zone_states["Z"] == ON
+
+
+def test_echo_latency_measured_once_per_frame():
+    protocol = JellyfishProtocol()
+    protocol.run_pattern_written(["A", "B"], ON, 1.0)
+    protocol.receive(echo(ON, "A", "B"), 1.5)
+    histogram = protocol.metrics.latency["runPattern"]
+    assert (histogram.count, histogram.total) == (1, 0.5)
+
+
+def test_get_reply_latency_from_write_time():
+    protocol = JellyfishProtocol()
+    text, key = protocol.get_frame(["patternFileData", "F", "X"])
+    protocol.queue(text, key, now=0.0)
+    popped = protocol.pop_frame()
+    protocol.frame_written(popped[0], popped[1], popped[3], 2.0)
+    events = protocol.receive(
+        frame(patternFileData={"folders": "F", "name": "X", "jsonData": "{}"}), 2.25
+    )
+    assert events[0].key == ("patternFileData", "F", "X")
+    assert protocol.metrics.latency["patternFileData"].total == 0.25
+    assert key == (GET, "patternFileData", "F", "X")
+
+
+@pytest.mark.parametrize(
+    "payload",
+    [
+        {"zones": None},
+        {"zones": ["A"]},
+        {"patternFileList": None},
+        {"patternFileList": {"F": "X"}},
+        {"patternFileData": None},
+        {"patternFileData": ["F", "X"]},
+        {"runPattern": None},
+        {"runPattern": {"state": "on", "zoneName": ["Z"]}},
+        {"runPattern": {"state": [1], "zoneName": ["Z"]}},
+        {"runPattern": {"file": 5, "state": 1, "zoneName": ["Z"]}},
+        {"runPattern": {"state": 1, "zoneName": 7}},
+    ],
+)
+def test_malformed_payloads_are_ignored(payload):
+    protocol = JellyfishProtocol()
+    protocol.receive(frame(zones={"Z": {}}), 0.0)
+    protocol.receive(json.dumps({"cmd": "fromCtlr", **payload}), 1.0)
+    assert protocol.zones == {"Z": {}}
+    assert "Z" not in protocol.zone_states or protocol.zone_states["Z"].file == ""
+
+
+def test_pattern_list_skips_non_object_entries():
+    protocol = JellyfishProtocol()
+    protocol.receive(frame(patternFileList=[None, {"folders": "F", "name": "X"}, "junk"]), 1.0)
+    assert protocol.catalog.file_for("X") == "F/X"
+    payload, catalog = JellyfishProtocol.decode_offloaded(
+        frame(patternFileList=[None, {"folders": "F", "name": "X"}]), 1
+    )
+    assert catalog.file_for("X") == "F/X"
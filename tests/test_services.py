@@ -0,0 +1,97 @@
+import pytest
+
+pytest.importorskip("homeassistant")
+
+import voluptuous as vol  # noqa: E402
+
+from homeassistant.exceptions import HomeAssistantError  # noqa: E402
+
+from custom_components.jellyfish_lighting.const import (  # noqa: E402
+    DOMAIN,
+    SERVICE_GET_PATTERN_DATA,
+    SERVICE_RESTORE_SCENE,
+    SERVICE_RUN_PATTERN,
+    SERVICE_SAVE_SCENE,
+    SERVICE_SET_ZONE_PATTERN,
+)
+
+
+async def test_run_pattern_without_zones_is_rejected(hass, setup_services, controller):
+    await setup_services()
+    with pytest.raises(HomeAssistantError):
+        await hass.services.async_call(
+            DOMAIN, SERVICE_RUN_PATTERN, {"file": "F/X"}, blocking=True
+        )
+
+    assert controller.run_patterns == []
+
+
+async def test_set_zone_pattern_without_zones_is_rejected(hass, setup_services, controller):
+    await setup_services()
+    with pytest.raises(HomeAssistantError):
+        await hass.services.async_call(
+            DOMAIN, SERVICE_SET_ZONE_PATTERN, {"pattern": "X"}, blocking=True
+        )
+
+    assert controller.run_patterns == []
+
+
+async def test_run_pattern_all_zones(hass, setup_services, controller):
+    await setup_services()
+    await hass.services.async_call(
+        DOMAIN, SERVICE_RUN_PATTERN, {"file": "F/X", "all_zones": True}, blocking=True
+    )
+
+    assert await controller.runs(1) == [("F/X", 1, ["A", "B"])]
+
+
+@pytest.mark.parametrize(
+    "service, data",
+    [
+        (SERVICE_SAVE_SCENE, {}),
+        (SERVICE_RESTORE_SCENE, {"force": True}),
+        (SERVICE_GET_PATTERN_DATA, {"folder": "F"}),
+        (SERVICE_RUN_PATTERN, {"file": "F/X", "zone_names": ["A"], "state": 2}),
+    ],
+)
+async def test_invalid_service_data_is_rejected_by_schema(
+    hass, setup_services, controller, service, data
+):
+    await setup_services()
+    with pytest.raises(vol.Invalid):
+        await hass.services.async_call(
+            DOMAIN,
+            service,
+            data,
+            blocking=True,
+            return_response=service == SERVICE_GET_PATTERN_DATA,
+        )
+
+    assert controller.run_patterns == []
+
+
+async def test_zone_names_accepts_a_single_name(hass, setup_services, controller):
+    await setup_services()
+    await hass.services.async_call(
+        DOMAIN, SERVICE_RUN_PATTERN, {"file": "F/X", "zone_names": "A"}, blocking=True
+    )
+
+    assert await controller.runs(1) == [("F/X", 1, ["A"])]
+
+
+async def test_restore_scene_reports_failed_controllers(
+    hass, setup_services, controller, monkeypatch
+):
+    client = await setup_services()
+    await client.run_pattern("F/X", ["A", "B"])
+    await controller.runs(1)
+    await hass.services.async_call(DOMAIN, SERVICE_SAVE_SCENE, {"name": "evening"}, blocking=True)
+
+    async def fail(zone_states, force=False):
+        raise ConnectionError("link down")
+
+    monkeypatch.setattr(client, "apply_zone_states", fail)
+    with pytest.raises(HomeAssistantError, match="127.0.0.1"):
+        await hass.services.async_call(
+            DOMAIN, SERVICE_RESTORE_SCENE, {"name": "evening"}, blocking=True
+        )